@@ -13,4 +13,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "music_hub.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from music_hub.http_clients import async_clients, provider_http  # noqa: E402  (needs configured settings)
+
+
+async def application(scope, receive, send):
+    """
+    Django's ASGI handler only speaks HTTP, so answer lifespan events here and
+    close the pooled provider clients and sessions on shutdown.
+    """
+    if scope["type"] != "lifespan":
+        return await django_application(scope, receive, send)
+
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await async_clients.aclose()
+            provider_http.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
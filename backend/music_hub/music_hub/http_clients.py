@@ -0,0 +1,201 @@
+"""
+Shared, pooled HTTP clients for calls to the music providers.
+
+Async code uses httpx clients from async_clients. httpx clients are bound to
+the event loop they were first used on, so the manager keeps one set of
+clients per running loop; under ASGI that is a single long-lived pool per
+process. Sync code entering async code goes through async_to_sync_scoped,
+whose clients are closed before the call returns (async_to_sync may run the
+coroutine on a throwaway loop).
+
+Sync views use provider_http, which keeps one pooled requests.Session per
+upstream host.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULTS = {
+    "TIMEOUT": 10.0,
+    "CONNECT_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 100,
+    "MAX_KEEPALIVE_CONNECTIONS": 20,
+    "KEEPALIVE_EXPIRY": 30.0,
+    "HTTP2": True,
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.5,
+    "MAX_RETRY_AFTER": 10.0,
+}
+
+
+def get_client_config():
+    return {**DEFAULTS, **getattr(settings, "PROVIDER_HTTP_CLIENT", {})}
+
+
+def build_async_client():
+    config = get_client_config()
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config["TIMEOUT"], connect=config["CONNECT_TIMEOUT"]),
+        limits=httpx.Limits(
+            max_connections=config["MAX_CONNECTIONS"],
+            max_keepalive_connections=config["MAX_KEEPALIVE_CONNECTIONS"],
+            keepalive_expiry=config["KEEPALIVE_EXPIRY"],
+        ),
+        # Needs h2 (installed with httpx[http2]).
+        http2=config["HTTP2"],
+    )
+
+
+_scoped_clients = contextvars.ContextVar("scoped_clients", default=None)
+
+
+class AsyncClientManager:
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get(self, name="default"):
+        clients = _scoped_clients.get()
+        if clients is None:
+            clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(name)
+        if client is None or client.is_closed:
+            client = clients[name] = build_async_client()
+        return client
+
+    async def aclose(self):
+        """
+        Close every client opened on the running loop.
+        """
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    @contextlib.asynccontextmanager
+    async def scope(self):
+        """
+        Give the enclosed code (and tasks it starts) clients of its own,
+        closed on exit instead of being left on the loop.
+        """
+        clients = {}
+        token = _scoped_clients.set(clients)
+        try:
+            yield
+        finally:
+            _scoped_clients.reset(token)
+            for client in clients.values():
+                await client.aclose()
+
+
+async_clients = AsyncClientManager()
+
+
+def get_async_client(name="default"):
+    return async_clients.get(name)
+
+
+def async_to_sync_scoped(async_fn):
+    """
+    async_to_sync for sync callers (WSGI views, workers, commands): provider
+    clients opened by async_fn are reused within the call and closed before
+    it returns.
+    """
+
+    async def run(*args, **kwargs):
+        async with async_clients.scope():
+            return await async_fn(*args, **kwargs)
+
+    return async_to_sync(run)
+
+
+class CappedRetry(Retry):
+    """
+    Retry that honours Retry-After, but never sleeps longer than
+    MAX_RETRY_AFTER seconds on a request thread.
+    """
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, get_client_config()["MAX_RETRY_AFTER"])
+
+
+class TimeoutSession(requests.Session):
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def build_session():
+    config = get_client_config()
+    session = TimeoutSession(timeout=(config["CONNECT_TIMEOUT"], config["TIMEOUT"]))
+    # The session is shared by every user's requests to the host, so it must
+    # never carry cookies from one user's call into another's.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    retry = CappedRetry(
+        total=config["RETRIES"],
+        backoff_factor=config["BACKOFF_FACTOR"],
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=config["MAX_KEEPALIVE_CONNECTIONS"], max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ProviderSessions:
+    """
+    One pooled requests.Session per upstream host, with retries on 429/5xx for
+    idempotent methods, a default timeout on every call and no cookie jar
+    (the sessions are shared across users).
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = build_session()
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+
+provider_http = ProviderSessions()
@@ -0,0 +1,161 @@
+"""
+Cache for provider search results.
+
+Entries live in the "search" cache alias (settings.CACHES) and are keyed by
+provider, normalized query and limit. An entry is served as-is while fresh;
+after FRESH_TTL it is still served, but one background thread refreshes it
+from upstream (stale-while-revalidate) until it expires after STALE_TTL.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ALIAS": "search",
+    "FRESH_TTL": 300,
+    "STALE_TTL": 3600,
+    "REVALIDATE_LOCK_TTL": 30,
+}
+
+COUNTERS = ("hits", "stale_hits", "misses")
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    def __init__(self):
+        config = {**DEFAULTS, **getattr(settings, "SEARCH_CACHE", {})}
+        self.alias = config["ALIAS"]
+        self.fresh_ttl = config["FRESH_TTL"]
+        self.stale_ttl = config["STALE_TTL"]
+        self.revalidate_lock_ttl = config["REVALIDATE_LOCK_TTL"]
+        self._tasks = set()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, provider, query, limit):
+        digest = hashlib.sha256(normalize_query(query).encode()).hexdigest()
+        return f"search:{provider}:{limit}:{digest}"
+
+    def get_or_fetch(self, provider, query, limit, fetch):
+        """
+        Return (status_code, data) for a search, calling fetch() on a miss.
+        fetch must return (status_code, data); only 200 responses are cached.
+        """
+        key = self.key(provider, query, limit)
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                self._count(provider, "hits")
+            else:
+                self._count(provider, "stale_hits")
+                self._revalidate(key, fetch)
+            return 200, entry["data"]
+
+        self._count(provider, "misses")
+        status_code, data = fetch()
+        if status_code == 200:
+            self._store(key, data)
+        return status_code, data
+
+    async def aget_or_fetch(self, provider, query, limit, fetch):
+        """
+        Async get_or_fetch: fetch is a coroutine function and stale entries are
+        revalidated in a task on the running loop.
+        """
+        key = self.key(provider, query, limit)
+        entry = await self.cache.aget(key)
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                await self._acount(provider, "hits")
+            else:
+                await self._acount(provider, "stale_hits")
+                await self._arevalidate(key, fetch)
+            return 200, entry["data"]
+
+        await self._acount(provider, "misses")
+        status_code, data = await fetch()
+        if status_code == 200:
+            await self._astore(key, data)
+        return status_code, data
+
+    def stats(self, provider):
+        keys = {name: f"search-stats:{provider}:{name}" for name in COUNTERS}
+        values = self.cache.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    def _store(self, key, data):
+        entry = {"data": data, "fresh_until": time.time() + self.fresh_ttl}
+        self.cache.set(key, entry, timeout=self.stale_ttl)
+
+    def _count(self, provider, name):
+        key = f"search-stats:{provider}:{name}"
+        if not self.cache.add(key, 1, timeout=None):
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr().
+                self.cache.add(key, 1, timeout=None)
+
+    def _revalidate(self, key, fetch):
+        # Only one worker refreshes a given entry at a time.
+        if not self.cache.add(f"{key}:revalidating", 1, timeout=self.revalidate_lock_ttl):
+            return
+        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+
+    def _refresh(self, key, fetch):
+        try:
+            status_code, data = fetch()
+            if status_code == 200:
+                self._store(key, data)
+        except Exception as e:
+            logger.warning(f"Search cache revalidation failed for {key}: {e}")
+        finally:
+            self.cache.delete(f"{key}:revalidating")
+
+    async def _astore(self, key, data):
+        entry = {"data": data, "fresh_until": time.time() + self.fresh_ttl}
+        await self.cache.aset(key, entry, timeout=self.stale_ttl)
+
+    async def _acount(self, provider, name):
+        key = f"search-stats:{provider}:{name}"
+        if not await self.cache.aadd(key, 1, timeout=None):
+            try:
+                await self.cache.aincr(key)
+            except ValueError:
+                await self.cache.aadd(key, 1, timeout=None)
+
+    async def _arevalidate(self, key, fetch):
+        if not await self.cache.aadd(f"{key}:revalidating", 1, timeout=self.revalidate_lock_ttl):
+            return
+        task = asyncio.create_task(self._arefresh(key, fetch))
+        # Keep a reference so the task is not garbage collected mid-flight.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arefresh(self, key, fetch):
+        try:
+            status_code, data = await fetch()
+            if status_code == 200:
+                await self._astore(key, data)
+        except Exception as e:
+            logger.warning(f"Search cache revalidation failed for {key}: {e}")
+        finally:
+            await self.cache.adelete(f"{key}:revalidating")
+
+
+search_cache = SearchCache()
@@ -171,5 +171,112 @@ SPOTIFY_REDIRECT_URI = "http://127.0.0.1:8000/api/spotify/callback"
 SOUNDCLOUD_CLIENT_ID = os.getenv("SOUNDCLOUD_CLIENT_ID")
 SOUNDCLOUD_CLIENT_SECRET = os.getenv("SOUNDCLOUD_CLIENT_SECRET")
 SOUNDCLOUD_REDIRECT_URI = "http://127.0.0.1:3000/soundcloud/callback"
+# Cache alias used to share the app (client-credentials) token between
+# workers. Set the SOUNDCLOUD_APP_TOKEN_CACHE environment variable to an
+# empty string to keep the token per process instead. It is only shared
+# across processes when SHARED_CACHE_BACKEND (see CACHES) is Redis or
+# Memcached.
+SOUNDCLOUD_APP_TOKEN_CACHE = os.getenv("SOUNDCLOUD_APP_TOKEN_CACHE", "shared") or None
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Pooled HTTP clients for provider calls (music_hub/http_clients.py). HTTP2
+# applies to the async httpx clients; RETRIES, BACKOFF_FACTOR and
+# MAX_RETRY_AFTER to the sync requests sessions.
+PROVIDER_HTTP_CLIENT = {
+    "TIMEOUT": 10.0,
+    "CONNECT_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 100,
+    "MAX_KEEPALIVE_CONNECTIONS": 20,
+    "KEEPALIVE_EXPIRY": 30.0,
+    "HTTP2": True,
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.5,
+    "MAX_RETRY_AFTER": 10.0,
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Provider search results (music_hub/search_cache.py). LocMemCache evicts
+    # least recently used entries; point it at a shared backend in production.
+    "search": {
+        "BACKEND": os.getenv(
+            "SEARCH_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("SEARCH_CACHE_LOCATION", "search"),
+        "TIMEOUT": 3600,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    # State every worker has to see alike: provider access tokens, the
+    # SoundCloud app token and playlist roles. LocMemCache only works for a single process; point
+    # SHARED_CACHE_BACKEND at Redis or Memcached when running several workers.
+    "shared": {
+        "BACKEND": os.getenv(
+            "SHARED_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("SHARED_CACHE_LOCATION", "shared"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Valid provider access tokens (music_hub/token_cache.py).
+TOKEN_CACHE = {
+    "ALIAS": "shared",
+}
+
+SEARCH_CACHE = {
+    "ALIAS": "search",
+    "FRESH_TTL": 300,
+    "STALE_TTL": 3600,
+}
+
+# AI playlist analyses (playlist/services/analysis_cache.py), reused while the
+# playlist's track set is unchanged.
+AI_ANALYSIS_CACHE = {
+    "ALIAS": "default",
+    "TTL": 24 * 60 * 60,
+}
+
+# Stream the LLM completion and start provider searches for each suggestion as
+# soon as it is generated, instead of waiting for the whole analysis.
+AI_STREAM_SUGGESTIONS = True
+
+# Resolver stage of RecommendationService (playlist/services/resolver.py):
+# concurrent lookups per provider, time budget per recommendation run, and how
+# long a resolved (provider, artist, title) lookup is shared across users.
+RECOMMENDATION_RESOLVER = {
+    "ALIAS": "search",
+    "CONCURRENCY": {"spotify": 4, "soundcloud": 4},
+    "BUDGET": 10.0,
+    "LOOKUP_TTL": 24 * 60 * 60,
+}
+
+# How often the recommendation job event stream checks the job for progress.
+RECOMMENDATION_JOB_POLL_INTERVAL = 0.5
+
+# Longest a job event stream stays open (seconds) before it ends with a
+# "timeout" event.
+RECOMMENDATION_JOB_STREAM_TIMEOUT = 120
+
+# How often a worker marks a running job as alive (seconds); keep it well
+# below run_recommendation_jobs --stale-after.
+RECOMMENDATION_JOB_HEARTBEAT_INTERVAL = 30
+
+# Concurrent page requests when importing a Spotify playlist.
+PLAYLIST_IMPORT_CONCURRENCY = 8
+
+# Cached playlist roles (playlist/membership.py), dropped on collaborator and
+# follower changes. The cache must be shared by every worker, or a removed
+# collaborator keeps their role on the others until the TTL runs out.
+PLAYLIST_MEMBERSHIP_CACHE = {
+    "ALIAS": "shared",
+    "TTL": 300,
+}
+
+# Per-provider deadline (seconds) for the unified /api/search/ endpoint.
+UNIFIED_SEARCH_DEADLINES = {
+    "spotify": 2.0,
+    "soundcloud": 2.0,
+}
@@ -0,0 +1,28 @@
+import threading
+from contextlib import contextmanager
+
+
+class KeyedLock:
+    """
+    One lock per key, created on demand and dropped once nobody holds or
+    waits for it. Threads in the same process asking for the same key run
+    one at a time.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def __call__(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
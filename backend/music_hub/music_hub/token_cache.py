@@ -0,0 +1,57 @@
+"""
+Cache of valid provider access tokens.
+
+get_valid_spotify_token/get_valid_soundcloud_token answer from here without a
+database query while the token has more than EXPIRY_MARGIN seconds left. The
+token models' post_save/post_delete signals keep it current on refresh and
+disconnect. Entries live in the TOKEN_CACHE alias, which has to be shared by
+all workers (SHARED_CACHE_BACKEND) when there is more than one: a revoked
+token must stop being served everywhere, not just in the process that
+handled the disconnect.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+EXPIRY_MARGIN = 60
+
+DEFAULTS = {
+    "ALIAS": "shared",
+}
+
+
+class TokenCache:
+    def __init__(self):
+        config = {**DEFAULTS, **getattr(settings, "TOKEN_CACHE", {})}
+        self.alias = config["ALIAS"]
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(provider, user_id):
+        return f"access-token:{provider}:{user_id}"
+
+    def get(self, provider, user_id):
+        return self.cache.get(self.key(provider, user_id))
+
+    async def aget(self, provider, user_id):
+        return await self.cache.aget(self.key(provider, user_id))
+
+    def set(self, provider, user_id, access_token, expires_at):
+        timeout = int(expires_at.timestamp() - EXPIRY_MARGIN - time.time())
+        if not access_token or timeout <= 0:
+            return self.invalidate(provider, user_id)
+        self.cache.set(self.key(provider, user_id), access_token, timeout=timeout)
+
+    def invalidate(self, provider, user_id):
+        self.cache.delete(self.key(provider, user_id))
+
+    def clear(self):
+        self.cache.clear()
+
+
+token_cache = TokenCache()
@@ -0,0 +1,88 @@
+"""
+Single-flight refresh of provider OAuth tokens.
+
+Only one refresh per (provider, user) runs at a time in a process: threads
+wait on a per-user lock and then reuse the fresh token. No database lock is
+held while the provider is called. The new token is written with a
+compare-and-swap under a short row lock: if another process refreshed the
+token in the meantime, its result is kept and returned instead.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from music_hub.single_flight import KeyedLock
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    def __init__(self, provider, model, request_refresh):
+        """
+        request_refresh(refresh_token) must return the provider's token
+        response as a dict, or None when the refresh failed.
+        """
+        self.provider = provider
+        self.model = model
+        self.request_refresh = request_refresh
+        self._single_flight = KeyedLock()
+
+    def refresh(self, user_id, ahead=timedelta(0)):
+        """
+        Refresh the user's token unless it is valid for longer than `ahead`.
+        Returns the current access token, or None if there is no token, or
+        the refresh failed and the stored token has expired.
+        """
+        return self.refresh_status(user_id, ahead)[0]
+
+    def refresh_status(self, user_id, ahead=timedelta(0)):
+        """
+        Like refresh, but returns (access_token, refreshed), where refreshed
+        says whether this call stored a new token from the provider.
+        """
+        with self._single_flight(user_id):
+            token = self.model.objects.filter(user_id=user_id).first()
+            if token is None:
+                return None, False
+            if token.expires_at > timezone.now() + ahead:
+                return token.access_token, False
+
+            try:
+                token_info = self.request_refresh(token.refresh_token)
+            except Exception as e:
+                logger.warning(f"{self.provider} token refresh failed for user {user_id}: {e}")
+                token_info = None
+
+            with transaction.atomic():
+                current = self.model.objects.select_for_update().filter(user_id=user_id).first()
+                if current is None:
+                    return None, False
+                if (current.access_token, current.refresh_token) != (
+                    token.access_token,
+                    token.refresh_token,
+                ):
+                    # Refreshed (possibly with a rotated refresh token, which
+                    # can be why ours failed) by another process meanwhile.
+                    return current.access_token, False
+
+                if not token_info or not token_info.get("access_token"):
+                    if current.expires_at > timezone.now():
+                        return current.access_token, False
+                    return None, False
+
+                current.access_token = token_info["access_token"]
+                # Providers may rotate refresh tokens; keep the old one otherwise.
+                current.refresh_token = token_info.get("refresh_token") or current.refresh_token
+                current.expires_at = timezone.now() + timedelta(
+                    seconds=int(token_info.get("expires_in", 3600))
+                )
+                current.save()
+                return current.access_token, True
+
+    def expiring_user_ids(self, ahead):
+        return list(
+            self.model.objects.filter(expires_at__lte=timezone.now() + ahead)
+            .values_list("user_id", flat=True)
+        )
@@ -1,10 +1,12 @@
 from django.contrib import admin
-from .models import Playlist, Queue, Track, QueueTrack
+from .models import Playlist, Queue, RecommendationJob, Recording, Track, QueueTrack
 from ordered_model.admin import OrderedStackedInline, OrderedInlineModelAdminMixin
 
 # Register your models here.
 admin.site.register(Playlist)
 admin.site.register(Track)
+admin.site.register(RecommendationJob)
+admin.site.register(Recording)
 
 
 class QueueTrackStackedInline(OrderedStackedInline):
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 
 class PlaylistConfig(AppConfig):
@@ -7,3 +8,9 @@ class PlaylistConfig(AppConfig):
 
     def ready(self):
         from . import signals
+        from .models import QueueTrack
+
+        # ordered_model shifts the remaining siblings after every delete.
+        # Gapped queue orders tolerate holes, and with a receiver attached
+        # Django can't fast-delete a whole queue.
+        post_delete.disconnect(sender=QueueTrack, dispatch_uid=QueueTrack.__name__)
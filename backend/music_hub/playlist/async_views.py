@@ -0,0 +1,221 @@
+"""
+Async counterparts of playlist views that wait on external services, for the
+ASGI application.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from adrf.decorators import api_view
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework import permissions
+from rest_framework.decorators import permission_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from soundcloud.async_views import aget_valid_soundcloud_token
+from spotify.async_views import aget_valid_spotify_token
+from .models import RecommendationJob
+from .services.importer import SOURCES, PlaylistImportError, import_playlist
+from .services.recommendations import RecommendationService
+from .services.search import UnifiedSearchService
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+async def suggest_songs(request, playlist_slug):
+    """
+    Endpoint: GET /api/async/playlist/hub/<slug>/suggest/
+
+    With ?stream=true the insight and every proposal are streamed as NDJSON
+    lines ({"event": ..., "data": ...}) as soon as they are known.
+    """
+    spotify_token = await aget_valid_spotify_token(request.user)
+    soundcloud_token = await aget_valid_soundcloud_token(request.user)
+
+    if not spotify_token:
+        return JsonResponse({'error': 'Missing Spotify Token in headers'}, status=401)
+
+    try:
+        service = RecommendationService(spotify_token=spotify_token, soundcloud_token=soundcloud_token)
+
+        if request.GET.get('stream') == 'true':
+            return StreamingHttpResponse(
+                _stream_proposals(service, playlist_slug),
+                content_type='application/x-ndjson',
+            )
+
+        data = await service.get_intelligent_proposals(playlist_slug)
+
+        return Response(data)
+
+    except Exception as e:
+        logger.error(f"Error in suggest_songs view: {e}")
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def _stream_proposals(service, playlist_slug):
+    try:
+        async for event, data in service.stream_proposals(playlist_slug):
+            yield json.dumps({'event': event, 'data': data}, cls=DjangoJSONEncoder) + "\n"
+    except Http404:
+        yield json.dumps({'event': 'error', 'data': 'Playlist not found'}) + "\n"
+    except Exception as e:
+        logger.error(f"Error in suggest_songs stream: {e}")
+        yield json.dumps({'event': 'error', 'data': str(e)}) + "\n"
+    yield json.dumps({'event': 'done', 'data': None}) + "\n"
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+async def unified_search(request):
+    """
+    Endpoint: GET /api/search/?q=<query>&limit=<n>
+
+    Searches every connected provider concurrently and returns one merged,
+    ranked list; providers that miss their deadline are reported in
+    "providers" and left out of the results.
+    """
+    query = request.GET.get('q')
+    if not query:
+        return Response({'error': 'No search term provided'}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=400)
+
+    spotify_token = await aget_valid_spotify_token(request.user)
+    soundcloud_token = await aget_valid_soundcloud_token(request.user)
+    if not spotify_token and not soundcloud_token:
+        return Response({'error': 'No music provider connected'}, status=400)
+
+    service = UnifiedSearchService(spotify_token=spotify_token, soundcloud_token=soundcloud_token)
+    return Response(await service.search(query, limit))
+
+
+TOKEN_GETTERS = {
+    'spotify': aget_valid_spotify_token,
+    'soundcloud': aget_valid_soundcloud_token,
+}
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+async def import_provider_playlist(request):
+    """
+    Endpoint: POST /api/playlist/import/
+    Body: {"platform": "spotify" | "soundcloud", "playlist_id": "<id>"}
+
+    Imports the whole upstream playlist into the user's Music Hub playlist
+    for it, creating it on first import and updating it afterwards. With
+    ?stream=true progress is streamed as NDJSON lines while pages arrive.
+    """
+    platform = request.data.get('platform')
+    playlist_id = request.data.get('playlist_id')
+    if platform not in SOURCES or not playlist_id:
+        return Response(
+            {'error': 'platform (spotify or soundcloud) and playlist_id are required'},
+            status=400,
+        )
+
+    token = await TOKEN_GETTERS[platform](request.user)
+    if not token:
+        return Response({'error': f'{platform} account not connected'}, status=400)
+
+    events = import_playlist(SOURCES[platform](token), request.user, str(playlist_id))
+
+    if request.GET.get('stream') == 'true':
+        return StreamingHttpResponse(
+            _stream_import(events), content_type='application/x-ndjson'
+        )
+
+    result = None
+    try:
+        async for event, data in events:
+            result = data
+    except PlaylistImportError as e:
+        return Response({'error': e.message}, status=e.status)
+    if result is None:
+        return Response({'error': 'The import finished without a result'}, status=502)
+    return Response(result, status=201 if result['created'] else 200)
+
+
+async def _stream_import(events):
+    try:
+        async for event, data in events:
+            yield json.dumps({'event': event, 'data': data}) + "\n"
+    except PlaylistImportError as e:
+        yield json.dumps({'event': 'error', 'data': e.message}) + "\n"
+    except Exception as e:
+        logger.error(f"Error in playlist import stream: {e}")
+        yield json.dumps({'event': 'error', 'data': str(e)}) + "\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only used for error responses; streams are written by the view.
+        return f"event: error\ndata: {json.dumps(data)}\n\n".encode()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+async def suggest_job_events(request, job_id):
+    """
+    Endpoint: GET /api/suggest/jobs/<id>/events/
+
+    Server-sent events for a job: "insight" once the playlist is analyzed,
+    one "proposal" per resolved suggestion, then "done" or "failed". A
+    stream is open for at most RECOMMENDATION_JOB_STREAM_TIMEOUT seconds and
+    ends with "timeout" if the job is still unfinished by then; clients can
+    reconnect or fall back to polling suggest_job. Waiting between polls
+    doesn't hold a worker thread.
+    """
+    job = await aget_object_or_404(RecommendationJob, pk=job_id, user=request.user)
+    response = StreamingHttpResponse(_job_events(job), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _job_events(job):
+    poll_interval = getattr(settings, 'RECOMMENDATION_JOB_POLL_INTERVAL', 0.5)
+    deadline = time.monotonic() + getattr(settings, 'RECOMMENDATION_JOB_STREAM_TIMEOUT', 120)
+    insight_sent, sent = False, 0
+    while True:
+        if not insight_sent and job.insight is not None:
+            insight_sent = True
+            yield _sse('insight', job.insight)
+
+        for proposal in job.proposals[sent:]:
+            yield _sse('proposal', proposal)
+        sent = len(job.proposals)
+
+        if job.is_finished:
+            yield _sse(job.status, {'total': job.total, 'completed': sent, 'error': job.error})
+            return
+        if time.monotonic() >= deadline:
+            yield _sse('timeout', {'status': job.status, 'total': job.total, 'completed': sent})
+            return
+
+        # A comment line on every poll keeps proxies from timing the stream
+        # out; when the client disconnects the ASGI handler cancels this
+        # generator at its next await.
+        yield ': keep-alive\n\n'
+        await asyncio.sleep(poll_interval)
+        await job.arefresh_from_db(fields=['status', 'insight', 'total', 'proposals', 'error'])
@@ -0,0 +1,39 @@
+"""
+Local search over the Track table.
+
+On SQLite, names and authors are indexed in an FTS5 table kept in sync by
+triggers (see migration 0004), so rows written by bulk_create, update() or
+raw deletes are indexed too. Provider search views answer from here first
+and only go upstream for the remainder.
+"""
+
+import re
+
+FTS_TABLE = "playlist_track_fts"
+
+
+def query_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def fts_query(query):
+    """
+    Build an FTS5 MATCH expression requiring every term, each as a prefix.
+    Terms are quoted so user input can never be parsed as FTS syntax.
+    """
+    return " ".join(f'"{term}"*' for term in query_terms(query))
+
+
+def top_up(local_items, remote_items, limit, key="id"):
+    """
+    Local catalog hits first, then provider hits not already among them.
+    """
+    seen = {str(item[key]) for item in local_items}
+    merged = list(local_items)
+    for item in remote_items:
+        if len(merged) >= limit:
+            break
+        if str(item.get(key)) not in seen:
+            seen.add(str(item.get(key)))
+            merged.append(item)
+    return merged[:limit]
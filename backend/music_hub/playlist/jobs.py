@@ -0,0 +1,99 @@
+"""
+Recommendation jobs.
+
+POST .../suggest/jobs/ stores a pending RecommendationJob; the
+run_recommendation_jobs worker claims it, runs RecommendationService and
+writes the insight and every proposal to the row as soon as they are known.
+Clients poll the job or follow it as server-sent events.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from music_hub.http_clients import async_to_sync_scoped
+from soundcloud.views import get_valid_soundcloud_token
+from spotify.views import get_valid_spotify_token
+from .models import RecommendationJob
+from .services.recommendations import RecommendationService
+
+logger = logging.getLogger(__name__)
+
+
+def job_state(job, after=0):
+    """
+    Public view of a job; proposals are listed from index after onwards
+    (in completion order) so pollers can fetch only what is new.
+    """
+    return {
+        "id": str(job.pk),
+        "playlist": str(job.playlist.slug),
+        "status": job.status,
+        "insight": job.insight,
+        "total": job.total,
+        "completed": len(job.proposals),
+        "proposals": job.proposals[after:],
+        "error": job.error,
+    }
+
+
+def run_job(job):
+    """
+    Run a claimed job to completion in the calling thread.
+    """
+    spotify_token = get_valid_spotify_token(job.user)
+    soundcloud_token = get_valid_soundcloud_token(job.user)
+    if not spotify_token:
+        return _finish(job, RecommendationJob.FAILED, error="Spotify account not connected")
+
+    service = RecommendationService(spotify_token=spotify_token, soundcloud_token=soundcloud_token)
+    try:
+        # async_to_sync keeps the ORM writes in _run on this thread's connection.
+        async_to_sync_scoped(_run)(job, service)
+    except Exception as e:
+        logger.error(f"Recommendation job {job.pk} failed: {e}")
+        return _finish(job, RecommendationJob.FAILED, error=str(e))
+    return _finish(job, RecommendationJob.DONE)
+
+
+async def _run(job, service):
+    save = sync_to_async(_save_progress)
+    # Progress saves only happen once suggestions resolve; keep the job
+    # visibly alive while the model is still analyzing.
+    heartbeat = asyncio.ensure_future(_heartbeat(job))
+    try:
+        async for event, data in service.stream_proposals(job.playlist.slug):
+            if event == "insight":
+                job.insight = data
+                await save(job, ["insight"])
+            elif event == "total":
+                job.total = data
+                await save(job, ["total"])
+            else:
+                job.proposals.append(data)
+                await save(job, ["proposals"])
+    finally:
+        heartbeat.cancel()
+
+
+async def _heartbeat(job):
+    interval = getattr(settings, "RECOMMENDATION_JOB_HEARTBEAT_INTERVAL", 30)
+    while True:
+        await asyncio.sleep(interval)
+        await RecommendationJob.objects.filter(pk=job.pk).aupdate(heartbeat_at=timezone.now())
+
+
+def _save_progress(job, fields):
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=[*fields, "heartbeat_at"])
+
+
+def _finish(job, status, error=""):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at"])
+    return job
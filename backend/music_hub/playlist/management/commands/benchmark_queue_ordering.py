@@ -0,0 +1,88 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from users.models import CustomUser
+from playlist.models import QUEUE_ORDER_GAP, QueueTrack, Track
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare dense OrderedModel moves with gap-based QueueTrack moves on a "
+        "large queue. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=10000)
+        parser.add_argument("--moves", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            queue = self._build_queue(options["size"])
+
+            for strategy, move in (
+                ("dense", self._dense_move),
+                ("gap", self._gap_move),
+            ):
+                self._reset_orders(queue, dense=strategy == "dense")
+                self._run(strategy, queue, move, options["moves"], options["seed"])
+
+            transaction.set_rollback(True)
+
+    def _build_queue(self, size):
+        name = f"benchmark-{uuid.uuid4().hex}"
+        user = CustomUser.objects.create(username=name, email=f"{name}@example.com")
+        tracks = Track.objects.bulk_resolve(
+            [
+                {"track_id": f"{name[:20]}-{i}", "url": f"spotify:track:{i}"}
+                for i in range(size)
+            ]
+        )
+        user.queue.replace_tracks(tracks)
+        return user.queue
+
+    def _reset_orders(self, queue, dense):
+        queue.renumber()
+        if dense:
+            QueueTrack.objects.filter(queue=queue).update(order=F("order") / QUEUE_ORDER_GAP)
+
+    @staticmethod
+    def _dense_move(qt, target, to_end):
+        if to_end:
+            qt.bottom()
+        else:
+            qt.below(target)
+
+    @staticmethod
+    def _gap_move(qt, target, to_end):
+        if to_end:
+            qt.place_last()
+        else:
+            qt.place_below(target)
+
+    def _run(self, strategy, queue, move, moves, seed):
+        rng = random.Random(seed)
+        ids = list(QueueTrack.objects.filter(queue=queue).values_list("pk", flat=True))
+
+        elapsed = 0.0
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(moves):
+                qt_id, target_id = rng.sample(ids, 2)
+                qt = QueueTrack.objects.get(pk=qt_id)
+                target = QueueTrack.objects.get(pk=target_id)
+
+                started = time.perf_counter()
+                move(qt, target, to_end=i % 10 == 0)
+                elapsed += time.perf_counter() - started
+
+        self.stdout.write(
+            f"{strategy:>5}: {moves} moves on {len(ids)} items, "
+            f"{elapsed / moves * 1000:.2f} ms/move, "
+            f"{len(queries) / moves - 2:.1f} queries/move"
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from playlist.recordings import link_unlinked
+
+
+class Command(BaseCommand):
+    help = (
+        "Link tracks that have no canonical recording yet to a matching "
+        "Recording (or a new one). Only new tracks are processed, so it is "
+        "cheap to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        linked = link_unlinked(batch_size=options["batch_size"])
+        self.stdout.write(f"Linked {linked} tracks")
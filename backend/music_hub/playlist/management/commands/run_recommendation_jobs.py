@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from playlist.jobs import run_job
+from playlist.models import RecommendationJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued recommendation jobs. Polls for pending jobs until stopped; "
+        "with --once it drains the queue and exits. Several workers can run "
+        "side by side, each job is claimed by exactly one of them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=300,
+            help="Reclaim running jobs whose worker has not reported for this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+        processed = 0
+
+        while True:
+            close_old_connections()
+            job = RecommendationJob.objects.select_related("user", "playlist").claim_next(
+                stale_after
+            )
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            self.stdout.write(f"Job {job.pk}: {job.status}")
+
+        self.stdout.write(f"Processed {processed} jobs")
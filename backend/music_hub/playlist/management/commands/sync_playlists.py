@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.utils import timezone
+
+from music_hub.http_clients import async_to_sync_scoped
+from playlist.models import Playlist
+from playlist.services.importer import SOURCES
+from playlist.services.sync import sync_playlists
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync imported playlists with their Spotify/SoundCloud source. "
+        "Unchanged playlists cost one conditional request; changed ones get "
+        "a minimal diff of added, removed and moved tracks. Least recently "
+        "synced playlists go first; playlists whose last sync failed or was "
+        "skipped wait out a growing backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--platform", choices=sorted(SOURCES), action="append")
+        parser.add_argument("--limit", type=int, default=None)
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=0,
+            help="Only sync playlists last synced at least this many seconds ago.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        playlists = Playlist.objects.exclude(source_id="").filter(
+            Q(sync_retry_at__isnull=True) | Q(sync_retry_at__lte=now),
+            source_platform__in=options["platform"] or sorted(SOURCES),
+        )
+        if options["older_than"]:
+            cutoff = now - timedelta(seconds=options["older_than"])
+            playlists = playlists.filter(Q(synced_at__isnull=True) | Q(synced_at__lte=cutoff))
+        playlists = playlists.select_related("owner").order_by(
+            F("synced_at").asc(nulls_first=True)
+        )
+        playlists = list(playlists[: options["limit"]])
+
+        outcomes, changes = async_to_sync_scoped(sync_playlists)(
+            playlists, concurrency=options["concurrency"]
+        )
+        summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items()))
+        self.stdout.write(f"Synced {len(playlists)} playlists: {summary or 'nothing to do'}")
+        if changes:
+            self.stdout.write(
+                "Tracks: "
+                + ", ".join(f"{changes[key]} {key}" for key in ("added", "removed", "moved"))
+            )
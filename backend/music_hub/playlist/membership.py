@@ -0,0 +1,103 @@
+"""
+Who a user is to a playlist: owner, collaborator, follower or nobody.
+
+The role comes from one query with two EXISTS subqueries on the indexed
+through tables (never loading collaborator or follower lists), is cached
+per (playlist, user), and is memoized on the request so repeated permission
+checks within one request are free. m2m_changed on collaborators/followers
+drops the affected entries (playlist/signals.py). The cache is the "shared"
+alias by default, so an invalidation reaches every worker. Ownership is read
+from the playlist row itself and never cached.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+OWNER = "owner"
+COLLABORATOR = "collaborator"
+FOLLOWER = "follower"
+NONE = "none"
+
+EDIT_ROLES = {OWNER, COLLABORATOR}
+
+DEFAULTS = {
+    "ALIAS": "shared",
+    "TTL": 300,
+}
+
+
+class PlaylistMembership:
+    def __init__(self):
+        config = {**DEFAULTS, **getattr(settings, "PLAYLIST_MEMBERSHIP_CACHE", {})}
+        self.alias = config["ALIAS"]
+        self.ttl = config["TTL"]
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def role(self, user, playlist, request=None):
+        if not user or not user.is_authenticated:
+            return NONE
+        if playlist.owner_id == user.pk:
+            return OWNER
+
+        memo = None
+        if request is not None:
+            memo = request.__dict__.setdefault("_playlist_roles", {})
+            if (playlist.pk, user.pk) in memo:
+                return memo[(playlist.pk, user.pk)]
+
+        key = self._key(playlist.pk, user.pk)
+        role = self.cache.get(key)
+        if role is None:
+            role = self._query_role(playlist, user.pk)
+            self.cache.set(key, role, timeout=self.ttl)
+
+        if memo is not None:
+            memo[(playlist.pk, user.pk)] = role
+        return role
+
+    def can_edit(self, user, playlist, request=None):
+        return self.role(user, playlist, request) in EDIT_ROLES
+
+    def invalidate(self, playlist_id, user_ids):
+        self.cache.delete_many([self._key(playlist_id, user_id) for user_id in user_ids])
+
+    def invalidate_playlist(self, playlist_id):
+        """
+        Drop every cached role for the playlist (used when a relation is
+        cleared and the affected users are not known individually).
+        """
+        version_key = self._version_key(playlist_id)
+        if not self.cache.add(version_key, 1, timeout=None):
+            try:
+                self.cache.incr(version_key)
+            except ValueError:
+                self.cache.add(version_key, 1, timeout=None)
+
+    def _version_key(self, playlist_id):
+        return f"playlist-roles-version:{playlist_id}"
+
+    def _key(self, playlist_id, user_id):
+        version = self.cache.get(self._version_key(playlist_id), 0)
+        return f"playlist-role:{playlist_id}:{version}:{user_id}"
+
+    @staticmethod
+    def _query_role(playlist, user_id):
+        from .models import Playlist
+
+        playlists = Playlist.objects.filter(pk=playlist.pk)
+        is_collaborator, is_follower = playlists.annotate(
+            is_collaborator=playlists._member_of("collaborators", user_id),
+            is_follower=playlists._member_of("followers", user_id),
+        ).values_list("is_collaborator", "is_follower").get()
+
+        if is_collaborator:
+            return COLLABORATOR
+        if is_follower:
+            return FOLLOWER
+        return NONE
+
+
+membership = PlaylistMembership()
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:09
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tracks(apps, schema_editor):
+    Track = apps.get_model("playlist", "Track")
+    Playlist = apps.get_model("playlist", "Playlist")
+    QueueTrack = apps.get_model("playlist", "QueueTrack")
+    PlaylistTrack = Playlist.tracks.through
+
+    duplicates = (
+        Track.objects.values("platform", "track_id")
+        .annotate(keep_id=Min("id"), rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        keep_id = group["keep_id"]
+        stale_ids = list(
+            Track.objects.filter(platform=group["platform"], track_id=group["track_id"])
+            .exclude(id=keep_id)
+            .values_list("id", flat=True)
+        )
+        QueueTrack.objects.filter(track_id__in=stale_ids).update(track_id=keep_id)
+
+        linked = set(
+            PlaylistTrack.objects.filter(track_id=keep_id).values_list(
+                "playlist_id", flat=True
+            )
+        )
+        for entry in PlaylistTrack.objects.filter(track_id__in=stale_ids):
+            if entry.playlist_id in linked:
+                entry.delete()
+            else:
+                entry.track_id = keep_id
+                entry.save(update_fields=["track"])
+                linked.add(entry.playlist_id)
+
+        Track.objects.filter(id__in=stale_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="playlist",
+            index=models.Index(fields=["visibility"], name="playlist_visibility_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="playlist",
+            index=models.Index(fields=["-created_at"], name="playlist_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="playlist",
+            index=models.Index(
+                fields=["owner", "-created_at"], name="playlist_owner_created_idx"
+            ),
+        ),
+        migrations.RunPython(merge_duplicate_tracks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="track",
+            constraint=models.UniqueConstraint(
+                fields=("track_id", "platform"), name="unique_platform_track_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:12
+
+from django.db import migrations, models
+
+QUEUE_ORDER_GAP = 1024
+
+
+def spread_queue_orders(apps, schema_editor):
+    QueueTrack = apps.get_model("playlist", "QueueTrack")
+    queue_tracks = QueueTrack.objects.order_by("queue_id", "order", "pk")
+
+    changed = []
+    queue_id, position = None, 0
+    for qt in queue_tracks.only("id", "queue_id", "order").iterator():
+        if qt.queue_id != queue_id:
+            queue_id, position = qt.queue_id, 0
+        qt.order = position * QUEUE_ORDER_GAP
+        changed.append(qt)
+        position += 1
+
+    QueueTrack.objects.bulk_update(changed, ["order"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0002_track_platform_unique_and_playlist_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="queuetrack",
+            index=models.Index(
+                fields=["queue", "order"], name="queuetrack_queue_order_idx"
+            ),
+        ),
+        migrations.RunPython(spread_queue_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+FTS_TABLE = "playlist_track_fts"
+
+CREATE_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, author, content='playlist_track', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER playlist_track_fts_insert AFTER INSERT ON playlist_track BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, author) VALUES (new.id, new.name, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER playlist_track_fts_delete AFTER DELETE ON playlist_track BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, author)
+        VALUES ('delete', old.id, old.name, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER playlist_track_fts_update AFTER UPDATE OF name, author ON playlist_track BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, author)
+        VALUES ('delete', old.id, old.name, old.author);
+        INSERT INTO {FTS_TABLE}(rowid, name, author) VALUES (new.id, new.name, new.author);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS playlist_track_fts_insert",
+    "DROP TRIGGER IF EXISTS playlist_track_fts_delete",
+    "DROP TRIGGER IF EXISTS playlist_track_fts_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def run_on_sqlite(statements):
+    # Other backends fall back to a LIKE search in TrackManager.search.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0003_queuetrack_queue_order_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_INDEX), run_on_sqlite(DROP_INDEX)),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0005_recommendationjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recording",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=255)),
+                ("duration_bucket", models.PositiveIntegerField(blank=True, null=True)),
+                ("name", models.CharField(default="", max_length=255)),
+                ("author", models.CharField(default="", max_length=255)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["fingerprint"], name="recording_fingerprint_idx"
+                    ),
+                    models.Index(
+                        fields=["duration_bucket"], name="recording_duration_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="track",
+            name="recording",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="tracks",
+                to="playlist.recording",
+            ),
+        ),
+    ]
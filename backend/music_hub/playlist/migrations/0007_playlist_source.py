@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0006_recording"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="playlist",
+            name="source_id",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="playlist",
+            name="source_platform",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name="playlist",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source_id", ""), _negated=True),
+                fields=("owner", "source_platform", "source_id"),
+                name="unique_imported_playlist",
+            ),
+        ),
+    ]
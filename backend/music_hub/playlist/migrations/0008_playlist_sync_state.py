@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0007_playlist_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="playlist",
+            name="source_etag",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="playlist",
+            name="source_snapshot",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="playlist",
+            name="synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0008_playlist_sync_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="playlist",
+            name="sync_failures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="playlist",
+            name="sync_retry_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PLAYLIST_POSITION_GAP = 1024
+
+
+def spread_playlist_positions(apps, schema_editor):
+    PlaylistTrack = apps.get_model("playlist", "PlaylistTrack")
+    entries = PlaylistTrack.objects.order_by("playlist_id", "pk")
+
+    changed = []
+    playlist_id, position = None, 0
+    for entry in entries.only("id", "playlist_id", "position").iterator():
+        if entry.playlist_id != playlist_id:
+            playlist_id, position = entry.playlist_id, 0
+        position += PLAYLIST_POSITION_GAP
+        entry.position = position
+        changed.append(entry)
+
+    PlaylistTrack.objects.bulk_update(changed, ["position"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("playlist", "0009_playlist_sync_backoff"),
+    ]
+
+    operations = [
+        # Adopt the implicit through table as an explicit model; the table
+        # and its columns already exist.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="PlaylistTrack",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "playlist",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="playlist.playlist",
+                            ),
+                        ),
+                        (
+                            "track",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="playlist.track",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "playlist_playlist_tracks",
+                        "unique_together": {("playlist", "track")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="playlist",
+                    name="tracks",
+                    field=models.ManyToManyField(
+                        related_name="playlists",
+                        through="playlist.PlaylistTrack",
+                        to="playlist.track",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="playlisttrack",
+            name="position",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="playlisttrack",
+            index=models.Index(
+                fields=["playlist", "position"], name="playlist_track_position_idx"
+            ),
+        ),
+        migrations.RunPython(spread_playlist_positions, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,156 @@
 import uuid
-from ordered_model.models import OrderedModel
-from django.db import models
+from bisect import bisect_left
+from collections import Counter
+from urllib.parse import urlparse
+from ordered_model.models import OrderedModel, OrderedModelManager, OrderedModelQuerySet
+from django.db import connection, models, transaction
+from django.db.models import (
+    Count, Exists, IntegerField, Max, OuterRef, Prefetch, Q, Subquery, Sum,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed
+from django.utils import timezone
 from users.models import CustomUser
 
+from .catalog import FTS_TABLE, fts_query, query_terms
+
+# Queue tracks are spaced this far apart so a move can take a free order
+# value between its new neighbours instead of shifting every row in between.
+QUEUE_ORDER_GAP = 1024
+
+# The largest order value a PositiveIntegerField holds on every backend. A
+# queue is renumbered before any of its orders would grow past it.
+QUEUE_ORDER_MAX = 2**31 - 1
+
+# Playlist track positions use the same spacing (and the same upper bound),
+# so a moved or inserted track can usually take a free value in between.
+PLAYLIST_POSITION_GAP = 1024
+
+
+PLATFORM_HOSTS = {
+    "spotify.com": "spotify",
+    "spotify.link": "spotify",
+    "soundcloud.com": "soundcloud",
+    "snd.sc": "soundcloud",
+}
+
+
+def detect_platform(url):
+    if url.startswith("spotify:"):
+        return "spotify"
+    host = (urlparse(url).hostname or "").lower()
+    for domain, platform in PLATFORM_HOSTS.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return platform
+    return "unknown"
+
+
+class TrackManager(models.Manager):
+    TRACK_FIELDS = (
+        "track_id",
+        "url",
+        "platform",
+        "name",
+        "author",
+        "track_duration",
+        "image_url",
+    )
+
+    @staticmethod
+    def lookup_key(track_data):
+        url = track_data.get("url")
+        platform = detect_platform(url) if url else track_data.get("platform", "")
+        return platform, str(track_data.get("track_id"))
+
+    def bulk_resolve(self, tracks_data):
+        """
+        Resolve a list of track dicts to Track instances in input order,
+        using one lookup query and one bulk insert for the missing rows.
+        """
+        keys = [self.lookup_key(track_data) for track_data in tracks_data]
+        if not keys:
+            return []
+
+        resolved = {}
+        track_ids = {track_id for _, track_id in keys}
+        for track in self.filter(track_id__in=track_ids):
+            resolved.setdefault((track.platform, track.track_id), track)
+
+        missing = {}
+        for key, track_data in zip(keys, tracks_data):
+            if key in resolved or key in missing:
+                continue
+            fields = {
+                field: track_data[field]
+                for field in self.TRACK_FIELDS
+                if field in track_data
+            }
+            fields["platform"], fields["track_id"] = key
+            missing[key] = self.model(**fields)
+
+        if missing:
+            # Rows inserted concurrently by another request are skipped by the
+            # unique constraint and picked up by the re-select below.
+            self.bulk_create(missing.values(), ignore_conflicts=True)
+            missing_ids = {track_id for _, track_id in missing}
+            for track in self.filter(track_id__in=missing_ids):
+                key = (track.platform, track.track_id)
+                if key in missing:
+                    resolved[key] = track
+
+        return [resolved[key] for key in keys]
+
+    def search(self, query, platform=None, limit=10):
+        """
+        Tracks whose name or author contain every term of query (as word
+        prefixes), best matches first. Served from the local catalog only.
+        """
+        if not query_terms(query):
+            return []
+
+        if connection.vendor != "sqlite":
+            tracks = self.all()
+            for term in query_terms(query):
+                tracks = tracks.filter(Q(name__icontains=term) | Q(author__icontains=term))
+            if platform:
+                tracks = tracks.filter(platform=platform)
+            return list(tracks.order_by("name")[:limit])
+
+        table = self.model._meta.db_table
+        sql = (
+            f"SELECT {table}.* FROM {FTS_TABLE} "
+            f"JOIN {table} ON {table}.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [fts_query(query)]
+        if platform:
+            sql += f" AND {table}.platform = %s"
+            params.append(platform)
+        sql += f" ORDER BY bm25({FTS_TABLE}) LIMIT %s"
+        params.append(limit)
+        return list(self.raw(sql, params))
+
+
+class Recording(models.Model):
+    """
+    Canonical recording that equivalent tracks on different platforms link
+    to (see playlist/recordings.py).
+    """
+
+    fingerprint = models.CharField(max_length=255)
+    duration_bucket = models.PositiveIntegerField(null=True, blank=True)
+    name = models.CharField(max_length=255, default="")
+    author = models.CharField(max_length=255, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["fingerprint"], name="recording_fingerprint_idx"),
+            models.Index(fields=["duration_bucket"], name="recording_duration_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.author} - {self.name}"
+
 
 class Track(models.Model):
     track_id = models.CharField(max_length=32)
@@ -12,32 +160,117 @@ class Track(models.Model):
     author = models.CharField(max_length=255, default="")
     track_duration = models.PositiveIntegerField(default=0, help_text="Track duration in milliseconds")
     image_url = models.URLField(max_length=255, blank=True, null=True)
+    recording = models.ForeignKey(
+        Recording,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tracks",
+    )
+
+    objects = TrackManager()
 
     def save(self, *args, **kwargs):
         if self.url:
-            if "spotify" in self.url:
-                self.platform = "spotify"
-            elif "soundcloud" in self.url:
-                self.platform = "soundcloud"
-            else:
-                self.platform = "unknown"
+            self.platform = detect_platform(self.url)
 
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.platform} - {self.name} - {self.author}"
 
+    def equivalents(self):
+        """
+        The same recording on other platforms (or re-uploads on this one).
+        """
+        if self.recording_id is None:
+            return Track.objects.none()
+        return Track.objects.filter(recording_id=self.recording_id).exclude(pk=self.pk)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["track_id", "platform"], name="unique_platform_track_id"
+            ),
+        ]
+
     @classmethod
     def get_or_create_safe(cls, track_data):
-        t_id = track_data.get('track_id')
+        platform, t_id = cls.objects.lookup_key(track_data)
+        defaults = {
+            field: value
+            for field, value in track_data.items()
+            if field not in ("platform", "track_id")
+        }
+        return cls.objects.get_or_create(platform=platform, track_id=t_id, defaults=defaults)
+
+
+def _related_aggregate(through, aggregate):
+    values = (
+        through.objects.filter(playlist=OuterRef("pk"))
+        .order_by()
+        .values("playlist")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Coalesce(Subquery(values, output_field=IntegerField()), 0)
+
+
+class PlaylistQuerySet(models.QuerySet):
+    def _member_of(self, relation, user):
+        through = getattr(self.model, relation).through
+        return Exists(through.objects.filter(playlist=OuterRef("pk"), customuser=user))
+
+    def owned_or_followed_by(self, user):
+        return self.filter(Q(owner=user) | self._member_of("followers", user))
 
-        existing_track = cls.objects.filter(track_id=t_id).first()
+    def visible_to(self, user, include_unlisted=False):
+        """
+        Playlists the user owns, collaborates on or follows, plus public ones
+        (and unlisted ones when accessed directly by slug).
+        """
+        visibility = ["public", "unlisted"] if include_unlisted else ["public"]
+        return self.filter(
+            Q(owner=user)
+            | self._member_of("collaborators", user)
+            | self._member_of("followers", user)
+            | Q(visibility__in=visibility)
+        )
 
-        if existing_track:
-            return existing_track, False
+    def with_details(self):
+        """
+        Load everything PlaylistSerializer touches in a fixed number of
+        queries, no matter how many playlists or tracks are returned.
+        """
+        user_ids = CustomUser.objects.only("id")
+        return self.select_related("owner").prefetch_related(
+            Prefetch("tracks", queryset=Track.objects.order_by("playlisttrack__position")),
+            Prefetch("collaborators", queryset=user_ids),
+            Prefetch("followers", queryset=user_ids),
+        ).annotate(
+            tracks_count=_related_aggregate(self.model.tracks.through, Count("track")),
+            followers_count=_related_aggregate(
+                self.model.followers.through, Count("customuser")
+            ),
+        )
 
-        new_track = cls.objects.create(**track_data)
-        return new_track, True
+    def with_summary(self):
+        """
+        Annotate the aggregates PlaylistSummarySerializer needs instead of
+        loading the tracks themselves.
+        """
+        tracks = self.model.tracks.through
+        cover = (
+            tracks.objects.filter(playlist=OuterRef("pk"), track__image_url__isnull=False)
+            .exclude(track__image_url="")
+            .order_by("position", "pk")
+            .values("track__image_url")[:1]
+        )
+        return self.select_related("owner").annotate(
+            tracks_count=_related_aggregate(tracks, Count("track")),
+            total_duration=_related_aggregate(tracks, Sum("track__track_duration")),
+            cover_image=Subquery(cover),
+        )
 
 
 class Playlist(models.Model):
@@ -48,7 +281,7 @@ class Playlist(models.Model):
     )
 
     name = models.CharField(max_length=100)
-    tracks = models.ManyToManyField(Track, related_name="playlists")
+    tracks = models.ManyToManyField(Track, through="PlaylistTrack", related_name="playlists")
     owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     collaborators = models.ManyToManyField(
         CustomUser, related_name="collaborators", blank=True
@@ -61,27 +294,494 @@ class Playlist(models.Model):
     )
     slug = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set on playlists imported from a provider (playlist/services/importer.py).
+    source_platform = models.CharField(max_length=20, blank=True, default="")
+    source_id = models.CharField(max_length=255, blank=True, default="")
+    source_snapshot = models.CharField(max_length=255, blank=True, default="")
+    source_etag = models.CharField(max_length=255, blank=True, default="")
+    synced_at = models.DateTimeField(null=True, blank=True)
+    # Consecutive failed or skipped syncs, and when to try again.
+    sync_failures = models.PositiveIntegerField(default=0)
+    sync_retry_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PlaylistQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["visibility"], name="playlist_visibility_idx"),
+            models.Index(fields=["-created_at"], name="playlist_created_at_idx"),
+            models.Index(fields=["owner", "-created_at"], name="playlist_owner_created_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "source_platform", "source_id"],
+                condition=~Q(source_id=""),
+                name="unique_imported_playlist",
+            ),
+        ]
+
+    def can_edit(self, user, request=None):
+        from .membership import membership
 
-    def can_edit(self, user):
-        if user == self.owner:
-            return True
-        if self.collaborators.filter(id=user.id).exists():
-            return True
-        return False
+        return membership.can_edit(user, self, request)
+
+    def sync_tracks(self, tracks):
+        """
+        Make the playlist hold exactly tracks, in that order, writing only the
+        difference: removed tracks are deleted, new ones inserted, and of the
+        kept tracks only those outside the longest run already in the right
+        relative order (a longest increasing subsequence) get a new position.
+
+        Moved and new tracks take free positions between their neighbours;
+        the playlist is renumbered only when a gap has run out.
+
+        Returns the number of added, removed and moved tracks.
+        """
+        current = list(
+            PlaylistTrack.objects.filter(playlist=self)
+            .order_by("position", "pk")
+            .only("id", "playlist", "track", "position")
+        )
+        target = list(dict.fromkeys(track.pk for track in tracks))
+        index = {track_id: i for i, track_id in enumerate(target)}
+
+        removed = [entry for entry in current if entry.track_id not in index]
+        kept = {entry.track_id: entry for entry in current if entry.track_id in index}
+        entries = list(kept.values())
+        stable = _longest_increasing_subsequence([index[entry.track_id] for entry in entries])
+        positions = _spread_positions(
+            target, {entries[i].track_id: entries[i].position for i in stable}
+        )
+        if positions is None:
+            positions = {
+                track_id: (i + 1) * PLAYLIST_POSITION_GAP for i, track_id in enumerate(target)
+            }
+
+        changed = []
+        for entry in entries:
+            if entry.position != positions[entry.track_id]:
+                entry.position = positions[entry.track_id]
+                changed.append(entry)
+        added = [
+            PlaylistTrack(playlist=self, track_id=track_id, position=positions[track_id])
+            for track_id in target
+            if track_id not in kept
+        ]
+
+        with transaction.atomic():
+            if removed:
+                PlaylistTrack.objects.filter(pk__in=[entry.pk for entry in removed]).delete()
+            PlaylistTrack.objects.bulk_update(changed, ["position"])
+            PlaylistTrack.objects.bulk_create(added)
+
+        # The bulk writes above bypass RelatedManager, so drop any prefetched
+        # tracks and notify m2m_changed receivers (cache invalidation) ourselves.
+        getattr(self, "_prefetched_objects_cache", {}).pop("tracks", None)
+        for action, pk_set in (
+            ("post_remove", {entry.track_id for entry in removed}),
+            ("post_add", {entry.track_id for entry in added}),
+        ):
+            if pk_set:
+                m2m_changed.send(
+                    sender=PlaylistTrack,
+                    instance=self,
+                    action=action,
+                    reverse=False,
+                    model=Track,
+                    pk_set=pk_set,
+                    using=PlaylistTrack.objects.db,
+                )
+
+        return {"added": len(added), "removed": len(removed), "moved": len(entries) - len(stable)}
 
     def __str__(self):
         return f"{self.owner}`s playlist - {self.name}"
 
 
+def _longest_increasing_subsequence(values):
+    """
+    Indices of one longest strictly increasing subsequence of values, in
+    O(n log n).
+    """
+    tails, tail_values, previous = [], [], [None] * len(values)
+    for i, value in enumerate(values):
+        k = bisect_left(tail_values, value)
+        previous[i] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+
+    indices = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        indices.add(i)
+        i = previous[i]
+    return indices
+
+
+def _spread_positions(target, anchors):
+    """
+    Positions for target (track ids in order) that keep the anchored tracks
+    where they are and spread the others evenly between them, or None when
+    some gap is too small to hold its tracks.
+    """
+    positions = dict(anchors)
+    run, low = [], 0
+    for track_id in target + [None]:
+        high = anchors.get(track_id)
+        if track_id is not None and high is None:
+            run.append(track_id)
+            continue
+        if run:
+            top = high if high is not None else low + (len(run) + 1) * PLAYLIST_POSITION_GAP
+            step = (top - low) // (len(run) + 1)
+            if not step or low + step * len(run) > QUEUE_ORDER_MAX:
+                return None
+            for i, run_id in enumerate(run, 1):
+                positions[run_id] = low + step * i
+            run = []
+        if high is not None:
+            low = high
+    return positions
+
+
+class PlaylistTrackQuerySet(models.QuerySet):
+    def place_unpositioned(self, playlist_ids):
+        """
+        Move entries added through Playlist.tracks, which can't set a
+        position, to the end of their playlists in insertion order.
+        """
+        entries = list(
+            self.filter(playlist_id__in=playlist_ids, position__isnull=True)
+            .order_by("pk")
+            .only("id", "playlist", "position")
+        )
+        if not entries:
+            return
+        tails = dict(
+            self.filter(playlist_id__in={entry.playlist_id for entry in entries})
+            .order_by()
+            .values("playlist")
+            .annotate(tail=Max("position"))
+            .values_list("playlist", "tail")
+        )
+        for entry in entries:
+            entry.position = (tails.get(entry.playlist_id) or 0) + PLAYLIST_POSITION_GAP
+            tails[entry.playlist_id] = entry.position
+        self.bulk_update(entries, ["position"])
+
+
+class PlaylistTrack(models.Model):
+    """
+    A track's place in a playlist. Tracks are listed by position; positions
+    are spaced PLAYLIST_POSITION_GAP apart and only ever increase along the
+    playlist, but are not contiguous. position is NULL only between
+    Playlist.tracks.add() inserting a row and its post_add receiver placing
+    it at the end (playlist/signals.py).
+    """
+
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE)
+    track = models.ForeignKey(Track, on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(null=True)
+
+    objects = PlaylistTrackQuerySet.as_manager()
+
+    class Meta:
+        # The table of the implicit through model this one replaced.
+        db_table = "playlist_playlist_tracks"
+        unique_together = [("playlist", "track")]
+        indexes = [
+            models.Index(fields=["playlist", "position"], name="playlist_track_position_idx"),
+        ]
+
+
 class Queue(models.Model):
     user = models.OneToOneField(
         CustomUser, on_delete=models.CASCADE, related_name="queue"
     )
 
+    def replace_tracks(self, tracks):
+        """
+        Replace the queue contents with tracks, in order, using one DELETE and
+        one bulk INSERT.
+        """
+        # QueueTrack has no post_delete receivers (see PlaylistConfig.ready)
+        # and nothing cascades from it, so this is a single fast DELETE.
+        QueueTrack.objects.filter(queue=self).delete()
+
+        # QueueTrackQuerySet.bulk_create assigns gapped orders starting from
+        # the (now empty) queue's next order.
+        return QueueTrack.objects.bulk_create(
+            QueueTrack(queue=self, track=track) for track in tracks
+        )
+
+    def reorder(self, queue_track_ids):
+        """
+        Move the given queue tracks to the front in the given order, keeping
+        the relative order of any tracks not listed, and rewrite all order
+        values with a single bulk UPDATE.
+        """
+        try:
+            ids = [int(qt_id) for qt_id in queue_track_ids]
+        except (TypeError, ValueError):
+            raise ValueError("queue_track_ids must contain queue track ids")
+
+        if len(set(ids)) != len(ids):
+            raise ValueError("queue_track_ids must not contain duplicates")
+
+        with transaction.atomic():
+            self.lock()
+            current = list(QueueTrack.objects.filter(queue=self).only("id", "queue", "order"))
+            by_id = {qt.pk: qt for qt in current}
+            if not by_id.keys() >= set(ids):
+                raise ValueError("queue_track_ids contains tracks outside of the queue")
+
+            listed = set(ids)
+            ordered = [by_id[qt_id] for qt_id in ids]
+            ordered += [qt for qt in current if qt.pk not in listed]
+
+            return self._write_orders(ordered)
+
+    def renumber(self):
+        """
+        Spread the queue's order values evenly again, restoring the gaps
+        between neighbours.
+        """
+        with transaction.atomic():
+            self.lock()
+            return self._write_orders(
+                QueueTrack.objects.filter(queue=self).only("id", "queue", "order")
+            )
+
+    def lock(self):
+        """
+        Lock the queue row until the surrounding transaction ends, so
+        rewrites of the same queue's orders run one after another.
+        """
+        Queue.objects.select_for_update().filter(pk=self.pk).exists()
+
+    def _write_orders(self, queue_tracks):
+        changed = []
+        for position, qt in enumerate(queue_tracks):
+            if qt.order != position * QUEUE_ORDER_GAP:
+                qt.order = position * QUEUE_ORDER_GAP
+                changed.append(qt)
+
+        QueueTrack.objects.bulk_update(changed, ["order"])
+        return len(changed)
+
+
+class QueueTrackQuerySet(OrderedModelQuerySet):
+    def get_next_order(self):
+        order = self.get_max_order()
+        return order + QUEUE_ORDER_GAP if order is not None else 0
+
+    def next_order_for(self, queue_id, count=1):
+        """
+        First order value for count new entries at the end of the queue,
+        renumbering the queue first if they would run past QUEUE_ORDER_MAX.
+        """
+        queue_tracks = self.filter(queue_id=queue_id)
+        order = queue_tracks.get_next_order()
+        if order + (count - 1) * QUEUE_ORDER_GAP > QUEUE_ORDER_MAX:
+            Queue(pk=queue_id).renumber()
+            order = queue_tracks.get_next_order()
+        return order
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        counts = Counter(obj.queue_id for obj in objs)
+        next_orders = {}
+        for obj in objs:
+            if obj.queue_id not in next_orders:
+                next_orders[obj.queue_id] = self.next_order_for(obj.queue_id, counts[obj.queue_id])
+            obj.order = next_orders[obj.queue_id]
+            next_orders[obj.queue_id] += QUEUE_ORDER_GAP
+        # Skip OrderedModelQuerySet.bulk_create, which assigns dense orders.
+        return super(OrderedModelQuerySet, self).bulk_create(objs, *args, **kwargs)
+
+
+class QueueTrackManager(OrderedModelManager.from_queryset(QueueTrackQuerySet)):
+    pass
+
 
 class QueueTrack(OrderedModel):
+    """
+    Queue entry ordered with sparse gaps (see QUEUE_ORDER_GAP).
+
+    place_below/place_last move an entry with a single-row UPDATE, and
+    deletes leave holes instead of shifting later entries. The queue is only
+    renumbered when two neighbours have no free order value left between
+    them, or when an order would pass QUEUE_ORDER_MAX. The dense OrderedModel
+    moves (to/below/bottom...) keep working on gapped values, but they shift
+    every row in between.
+    """
+
     queue = models.ForeignKey(
         Queue, on_delete=models.CASCADE, related_name="queue_tracks"
     )
     track = models.ForeignKey(Track, on_delete=models.CASCADE)
     order_with_respect_to = "queue"
+
+    objects = QueueTrackManager()
+
+    class Meta(OrderedModel.Meta):
+        indexes = [
+            models.Index(fields=["queue", "order"], name="queuetrack_queue_order_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.order is None:
+            self.order = QueueTrack.objects.next_order_for(self.queue_id)
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete just this row. OrderedModel.delete would shift every later
+        entry down by one; gapped orders tolerate the hole, and cascade and
+        queryset deletes skip the shift too (see PlaylistConfig.ready).
+        """
+        return models.Model.delete(self, *args, **kwargs)
+
+    def _move_to(self, order):
+        QueueTrack.objects.filter(pk=self.pk).update(order=order)
+        self.order = order
+
+    def _renumber_queue(self, *entries):
+        self.queue.renumber()
+        for entry in (self, *entries):
+            entry.refresh_from_db(fields=["order"])
+
+    def place_below(self, target):
+        """
+        Move this entry directly after target. Raises ValueError if there is
+        no room even after renumbering the queue.
+        """
+        self._validate_ordering_reference(target)
+        if target.pk == self.pk:
+            return
+
+        order = self._order_below(target)
+        if order is None:
+            self._renumber_queue(target)
+            order = self._order_below(target)
+        if order is None:
+            raise ValueError("The queue is too long to move this track")
+        self._move_to(order)
+
+    def _order_below(self, target):
+        next_order = (
+            self.get_ordering_queryset()
+            .above_instance(target)
+            .exclude(pk=self.pk)
+            .order_by("order")
+            .values_list("order", flat=True)
+            .first()
+        )
+
+        if next_order is None:
+            order = target.order + QUEUE_ORDER_GAP
+        elif next_order - target.order > 1:
+            order = (target.order + next_order) // 2
+        else:
+            return None
+        return order if order <= QUEUE_ORDER_MAX else None
+
+    def place_last(self):
+        """
+        Move this entry to the end of the queue. Raises ValueError if there
+        is no room even after renumbering the queue.
+        """
+        last_order = self.get_ordering_queryset().exclude(pk=self.pk).get_max_order()
+        if last_order is None or last_order < self.order:
+            return
+        if last_order + QUEUE_ORDER_GAP > QUEUE_ORDER_MAX:
+            self._renumber_queue()
+            last_order = self.get_ordering_queryset().exclude(pk=self.pk).get_max_order()
+            if last_order < self.order:
+                return
+        if last_order + QUEUE_ORDER_GAP > QUEUE_ORDER_MAX:
+            raise ValueError("The queue is too long to move this track")
+        self._move_to(last_order + QUEUE_ORDER_GAP)
+
+
+class RecommendationJobQuerySet(models.QuerySet):
+    def claim_next(self, stale_after):
+        """
+        Atomically mark the oldest pending job (or a running job whose worker
+        went quiet for stale_after) as running and return it, or None. A
+        reclaimed job starts over, so progress left by the dead run is
+        cleared.
+        """
+        now = timezone.now()
+        claimable = self.filter(
+            Q(status=RecommendationJob.PENDING)
+            | Q(status=RecommendationJob.RUNNING, heartbeat_at__lt=now - stale_after)
+        ).order_by("created_at")
+
+        candidates = claimable.values_list("pk", "status", "heartbeat_at")[:10]
+        for pk, status, heartbeat_at in candidates:
+            # The conditional UPDATE is the lock: only one worker sees rowcount 1.
+            claimed = self.filter(
+                pk=pk, status=status, heartbeat_at=heartbeat_at
+            ).update(
+                status=RecommendationJob.RUNNING,
+                started_at=now,
+                heartbeat_at=now,
+                insight=None,
+                total=None,
+                proposals=[],
+                error="",
+            )
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+
+class RecommendationJob(models.Model):
+    """
+    A suggest request for a playlist, run by the run_recommendation_jobs
+    worker. Proposals are appended as soon as each one resolves, so clients
+    can poll or stream progress while the job is running.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    insight = models.JSONField(null=True, blank=True)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    proposals = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = RecommendationJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="recjob_status_created_idx"),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    def __str__(self):
+        return f"Recommendations for {self.playlist} ({self.status})"
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PlaylistCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "-created_at"
+
+
+class PlaylistTrackCursorPagination(CursorPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("position", "pk")
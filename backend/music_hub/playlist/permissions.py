@@ -1,12 +1,15 @@
 from rest_framework import permissions
 
+from .membership import COLLABORATOR, OWNER, membership
+
 
 class IsOwnerOrCollaboratorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        if obj.owner == request.user:
+        role = membership.role(request.user, obj, request)
+        if role == OWNER:
             return True
 
-        if request.user in obj.collaborators.all():
+        if role == COLLABORATOR:
             if request.method == "DELETE":
                 return False
             return True
@@ -0,0 +1,143 @@
+"""
+Cross-platform recording identity.
+
+Every Track is linked to a canonical Recording so the same song on Spotify
+and SoundCloud can be found with an index lookup. Tracks are matched on a
+normalized token set of artist and title, blocked by duration bucket:
+
+1. an exact fingerprint match (indexed) within neighbouring duration
+   buckets, then
+2. a token-set similarity scan over recordings in those buckets.
+
+Version markers (remix, live, acoustic...) are part of the fingerprint and
+must agree for a fuzzy match, so a remix never joins the original. Unmatched
+tracks, and tracks without any name or artist tokens, start a new Recording.
+Linking runs incrementally over tracks without a recording (see the
+link_recordings command).
+"""
+
+import re
+import unicodedata
+
+# Durations within one bucket of each other count as the same length.
+DURATION_BUCKET_MS = 5000
+MATCH_THRESHOLD = 0.75
+# Full containment of one token set in the other only counts as a match when
+# both sides have at least this many tokens ("Love" is not "Love Song").
+MIN_CONTAINMENT_TOKENS = 3
+
+NOISE_WORDS = {
+    "a", "and", "audio", "feat", "featuring", "ft", "hd", "hq", "lyric",
+    "lyrics", "official", "remaster", "remastered", "the", "version",
+    "video", "vs", "x",
+}
+
+# Words that make a different recording of the same song.
+VERSION_WORDS = {
+    "acoustic", "bootleg", "cover", "demo", "edit", "extended", "instrumental",
+    "karaoke", "live", "mashup", "remix", "reprise", "slowed", "sped", "unplugged",
+}
+
+BRACKETED = re.compile(r"[\(\[][^\)\]]*[\)\]]")
+
+
+def tokens(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    # Bracketed suffixes ("[Official Video]", "(feat. X)"...) are dropped,
+    # except for version markers such as "(Live)" or "(Remix)".
+    words = set()
+    for bracketed in BRACKETED.findall(text):
+        words |= set(re.findall(r"\w+", bracketed)) & VERSION_WORDS
+    text = BRACKETED.sub(" ", text)
+    words |= {word for word in re.findall(r"\w+", text) if word not in NOISE_WORDS}
+    return words
+
+
+def fingerprint(author, name):
+    """
+    Order-independent token set of artist and title, so that "Artist - Title"
+    uploads match tracks that keep the artist in a separate field.
+    """
+    return " ".join(sorted(tokens(author) | tokens(name)))[:255]
+
+
+def duration_bucket(duration_ms):
+    if not duration_ms:
+        return None
+    return round(duration_ms / DURATION_BUCKET_MS)
+
+
+def similarity(a, b):
+    """
+    Token-set similarity: Jaccard, or 1.0 when one set wholly contains the
+    other and both have at least MIN_CONTAINMENT_TOKENS tokens. Sets with
+    different version markers never match.
+    """
+    if not a or not b or a & VERSION_WORDS != b & VERSION_WORDS:
+        return 0.0
+    if min(len(a), len(b)) >= MIN_CONTAINMENT_TOKENS and (a <= b or b <= a):
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def link_track(track):
+    """
+    Attach track to the best matching Recording, creating one if nothing is
+    close enough. Returns the recording.
+    """
+    from .models import Recording
+
+    key = fingerprint(track.author, track.name)
+    bucket = duration_bucket(track.track_duration)
+
+    candidates = Recording.objects.all()
+    if bucket is not None:
+        candidates = candidates.filter(duration_bucket__range=(bucket - 1, bucket + 1))
+
+    recording = None
+    # Nothing to compare an empty fingerprint on: such tracks stay alone.
+    if key:
+        recording = candidates.filter(fingerprint=key).first()
+        if recording is None and bucket is not None:
+            recording = _best_fuzzy_match(candidates, set(key.split()))
+    if recording is None:
+        recording = Recording.objects.create(
+            fingerprint=key,
+            duration_bucket=bucket,
+            name=track.name,
+            author=track.author,
+        )
+
+    track.recording = recording
+    type(track).objects.filter(pk=track.pk).update(recording=recording)
+    return recording
+
+
+def _best_fuzzy_match(candidates, key_tokens):
+    best_id, best_score = None, MATCH_THRESHOLD
+    for recording_id, candidate in candidates.values_list("id", "fingerprint").iterator():
+        candidate_tokens = set(candidate.split())
+        if key_tokens.isdisjoint(candidate_tokens):
+            continue
+        score = similarity(key_tokens, candidate_tokens)
+        if score >= best_score:
+            best_id, best_score = recording_id, score
+    return candidates.model.objects.get(pk=best_id) if best_id else None
+
+
+def link_unlinked(batch_size=500):
+    """
+    Link every track that has no recording yet, oldest first. Returns the
+    number of tracks linked.
+    """
+    from .models import Track
+
+    linked = 0
+    while True:
+        batch = list(Track.objects.filter(recording__isnull=True).order_by("pk")[:batch_size])
+        if not batch:
+            return linked
+        for track in batch:
+            link_track(track)
+        linked += len(batch)
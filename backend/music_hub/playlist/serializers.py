@@ -17,11 +17,33 @@ class TrackSerializer(serializers.ModelSerializer):
             "track_duration",
             "image_url"
         ]
+        # Tracks are shared between playlists, so posting an already known
+        # (platform, track_id) resolves to the existing row instead of failing.
+        validators = []
+
+    def create(self, validated_data):
+        track, _ = Track.get_or_create_safe(validated_data)
+        return track
+
+
+class PlaylistTracksSerializer(serializers.ListSerializer):
+    """
+    A playlist's tracks by position. PlaylistQuerySet.with_details() orders
+    its prefetch the same way; otherwise the tracks are queried in order.
+    """
+
+    def to_representation(self, data):
+        tracks = data.all()
+        if "tracks" not in getattr(data.instance, "_prefetched_objects_cache", {}):
+            tracks = tracks.order_by("playlisttrack__position")
+        return super().to_representation(tracks)
 
 
 class PlaylistSerializer(serializers.ModelSerializer):
-    tracks = TrackSerializer(many=True)
+    tracks = PlaylistTracksSerializer(child=TrackSerializer())
     owner = UserSerializer(read_only=True)
+    tracks_count = serializers.SerializerMethodField()
+    followers_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Playlist
@@ -35,10 +57,23 @@ class PlaylistSerializer(serializers.ModelSerializer):
             "followers",
             "visibility",
             "created_at",
+            "tracks_count",
+            "followers_count",
         ]
 
         read_only_fields = ["slug", "owner", "created_at"]
 
+    def get_tracks_count(self, obj):
+        # Annotated by PlaylistQuerySet.with_details(); fall back to a COUNT otherwise.
+        if hasattr(obj, "tracks_count"):
+            return obj.tracks_count
+        return obj.tracks.count()
+
+    def get_followers_count(self, obj):
+        if hasattr(obj, "followers_count"):
+            return obj.followers_count
+        return obj.followers.count()
+
     def create(self, validated_data):
         collaborators = validated_data.pop("collaborators", [])
         followers = validated_data.pop("followers", [])
@@ -48,9 +83,7 @@ class PlaylistSerializer(serializers.ModelSerializer):
         playlist.collaborators.set(collaborators)
         playlist.followers.set(followers)
 
-        for track_data in tracks_data:
-            track,_ = Track.get_or_create_safe(track_data)
-            playlist.tracks.add(track)
+        playlist.sync_tracks(Track.objects.bulk_resolve(tracks_data))
 
         return playlist
 
@@ -68,20 +101,46 @@ class PlaylistSerializer(serializers.ModelSerializer):
 
         if followers_data is not None:
             instance.followers.set(followers_data)
+            instance.followers_count = len({user.pk for user in followers_data})
 
         if tracks_data is not None:
-            tracks_obj = []
-            for track_data in tracks_data:
-                track, created = Track.get_or_create_safe(track_data)
-                tracks_obj.append(track)
-
-            instance.tracks.set(tracks_obj)
+            tracks = Track.objects.bulk_resolve(tracks_data)
+            instance.sync_tracks(tracks)
+            instance.tracks_count = len({track.pk for track in tracks})
 
         instance.save()
 
         return instance
 
 
+class PlaylistSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact playlist representation without the nested track list. Expects a
+    queryset prepared with PlaylistQuerySet.with_summary().
+    """
+
+    owner = UserSerializer(read_only=True)
+    tracks_count = serializers.IntegerField(read_only=True)
+    total_duration = serializers.IntegerField(
+        read_only=True, help_text="Sum of track durations in milliseconds"
+    )
+    cover_image = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = Playlist
+        fields = [
+            "id",
+            "slug",
+            "name",
+            "owner",
+            "visibility",
+            "created_at",
+            "tracks_count",
+            "total_duration",
+            "cover_image",
+        ]
+
+
 class QueueTrackSerializer(
     serializers.HyperlinkedModelSerializer, OrderedModelSerializer
 ):
@@ -1,19 +1,32 @@
 import json
+import logging
 from openai import AsyncOpenAI
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 client = AsyncOpenAI(
     api_key=settings.GROQ_API_KEY,
     base_url="https://api.groq.com/openai/v1",
 )
 
+MODEL = "llama-3.3-70b-versatile"
 
-class AIAnalyzer:
-    @staticmethod
-    async def get_suggestions(tracks_data):
-        formatted_tracks = ", ".join([f"{t['name']} - {t['author']}" for t in tracks_data])
+INSIGHT_FIELDS = ("mood", "genre")
+
+
+def fallback_analysis():
+    """
+    Placeholder returned when the model call fails. A new dict every time,
+    flagged with "failed" so callers neither trust nor cache it.
+    """
+    return {"mood": "Unknown", "genre": "Unknown", "suggestions": [], "failed": True}
+
+
+def build_prompt(tracks_data):
+    formatted_tracks = ", ".join([f"{t['name']} - {t['author']}" for t in tracks_data])
 
-        prompt = f"""
+    return f"""
         Analyze the following playlist: [{formatted_tracks}].
         1. Identify the main genre and mood.
         2. Suggest 5 similar songs that are NOT on the list.
@@ -27,14 +40,146 @@ class AIAnalyzer:
         }}
         """
 
+
+class SuggestionStreamParser:
+    """
+    Incremental parser for the analysis JSON as the model writes it.
+
+    feed() takes the next piece of completion text and returns what it
+    completed: (field, value) for the top-level mood/genre strings and
+    ("suggestion", {...}) for every finished object of the suggestions
+    array, without waiting for the document to close. Every character is
+    scanned once; text is only kept while a string or suggestion object
+    that started in it is still open.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        # Top-level object state: the last key read and whether the next
+        # string is a key or that key's value.
+        self.key = None
+        self.expect_key = False
+        self.array_depth = None
+        self.object_start = None
+        self.fields = {}
+
+    def feed(self, chunk):
+        self.text += chunk
+        events = []
+
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.string_start is not None:
+                        events.extend(self._top_level_string(self.text[self.string_start:self.pos + 1]))
+                        self.string_start = None
+            elif char == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.string_start = self.pos
+            elif char in "{[":
+                if char == "[" and self.depth == 1 and not self.expect_key and self.key == "suggestions":
+                    if self.array_depth is None:
+                        self.array_depth = self.depth + 1
+                elif char == "{" and self.depth == self.array_depth:
+                    self.object_start = self.pos
+                self.depth += 1
+                if self.depth == 1:
+                    self.expect_key = True
+            elif char in "}]":
+                self.depth -= 1
+                if char == "}" and self.depth == self.array_depth and self.object_start is not None:
+                    events.extend(self._suggestion(self.text[self.object_start:self.pos + 1]))
+                    self.object_start = None
+                elif char == "]" and self.depth + 1 == self.array_depth:
+                    self.array_depth = -1
+            elif self.depth == 1 and char == ",":
+                self.expect_key = True
+            elif self.depth == 1 and char == ":":
+                self.expect_key = False
+            self.pos += 1
+
+        # Drop the scanned text unless an open string or object still needs it.
+        keep = min(
+            (start for start in (self.string_start, self.object_start) if start is not None),
+            default=self.pos,
+        )
+        if keep:
+            self.text = self.text[keep:]
+            self.pos -= keep
+            if self.string_start is not None:
+                self.string_start -= keep
+            if self.object_start is not None:
+                self.object_start -= keep
+        return events
+
+    def _top_level_string(self, raw):
+        value = json.loads(raw)
+        if self.expect_key:
+            self.key = value
+            return []
+        name, self.key = self.key, None
+        if name not in INSIGHT_FIELDS or name in self.fields:
+            return []
+        self.fields[name] = value
+        return [(name, value)]
+
+    @staticmethod
+    def _suggestion(raw):
+        try:
+            suggestion = json.loads(raw)
+        except ValueError:
+            return []
+        if not isinstance(suggestion, dict) or not {"title", "artist"} <= suggestion.keys():
+            return []
+        return [("suggestion", suggestion)]
+
+
+class AIAnalyzer:
+    @staticmethod
+    async def get_suggestions(tracks_data):
         try:
             response = await client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": prompt}],
+                model=MODEL,
+                messages=[{"role": "user", "content": build_prompt(tracks_data)}],
                 response_format={"type": "json_object"}
             )
             return json.loads(response.choices[0].message.content)
         except Exception as e:
-            print("blad")
-            print(e)
-            return {"mood": "Unknown", "genre": "Unknown", "suggestions": []}
\ No newline at end of file
+            logger.error(f"AI analysis failed: {e}")
+            return fallback_analysis()
+
+    @staticmethod
+    async def stream_suggestions(tracks_data):
+        """
+        Streaming get_suggestions: yields ("mood", str), ("genre", str) and
+        ("suggestion", {title, artist}) while the completion is generated,
+        or ("error", message) if the request fails midway.
+        """
+        parser = SuggestionStreamParser()
+        try:
+            stream = await client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": build_prompt(tracks_data)}],
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for event in parser.feed(chunk.choices[0].delta.content):
+                    yield event
+        except Exception as e:
+            logger.error(f"AI analysis stream failed: {e}")
+            yield "error", str(e)
@@ -0,0 +1,55 @@
+"""
+Cache for AI playlist analyses.
+
+An entry is stored per playlist together with a fingerprint of the playlist's
+track set and is only served while the fingerprint still matches, so a
+changed playlist is never answered with a stale analysis. m2m_changed on
+Playlist.tracks drops entries eagerly (playlist/signals.py); the fingerprint
+check also covers writes that bypass signals.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "TTL": 24 * 60 * 60,
+}
+
+
+class AnalysisCache:
+    def __init__(self):
+        config = {**DEFAULTS, **getattr(settings, "AI_ANALYSIS_CACHE", {})}
+        self.alias = config["ALIAS"]
+        self.ttl = config["TTL"]
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(playlist_id):
+        return f"ai-analysis:{playlist_id}"
+
+    @staticmethod
+    def fingerprint(track_ids):
+        joined = ",".join(str(track_id) for track_id in sorted(track_ids))
+        return hashlib.sha256(joined.encode()).hexdigest()
+
+    async def aget(self, playlist_id, fingerprint):
+        entry = await self.cache.aget(self.key(playlist_id))
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        return entry["analysis"]
+
+    async def aset(self, playlist_id, fingerprint, analysis):
+        entry = {"fingerprint": fingerprint, "analysis": analysis}
+        await self.cache.aset(self.key(playlist_id), entry, timeout=self.ttl)
+
+    def invalidate(self, playlist_ids):
+        self.cache.delete_many([self.key(playlist_id) for playlist_id in playlist_ids])
+
+
+analysis_cache = AnalysisCache()
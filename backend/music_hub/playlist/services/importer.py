@@ -0,0 +1,244 @@
+"""
+Import of provider playlists into Music Hub playlists.
+
+A source pages through the whole upstream playlist (Spotify pages are
+fetched concurrently, SoundCloud pages follow its cursor) and normalizes the
+items to Track-shaped dicts. save_import then resolves every track with
+Track.objects.bulk_resolve and creates or updates the owner's imported
+Playlist in one transaction. Later syncs go through playlist/services/sync.py.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from spotify.services.spotify import SpotifyService
+from soundcloud.services.soundcloud import SoundCloudService
+from .search import normalize_soundcloud_track, normalize_spotify_track
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+
+class PlaylistImportError(Exception):
+    def __init__(self, message, status=502):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _normalize(items, normalize):
+    tracks = []
+    for item in items:
+        try:
+            tracks.append(normalize(item))
+        except (KeyError, TypeError):
+            continue
+    return tracks
+
+
+class SpotifyPlaylistSource:
+    platform = "spotify"
+    PAGE_SIZE = 100
+    ITEM_FIELDS = "items(track(type,id,name,uri,duration_ms,artists(name),album(images)))"
+
+    def __init__(self, access_token):
+        self.service = SpotifyService(access_token)
+        self.concurrency = getattr(settings, "PLAYLIST_IMPORT_CONCURRENCY", DEFAULT_CONCURRENCY)
+
+    async def fetch_meta(self, playlist_id, etag=""):
+        """
+        Name, snapshot, ETag and track count of the playlist, or None when
+        etag is given and the playlist has not changed since (304).
+        """
+        response = await self.service.get_async(
+            f"/playlists/{playlist_id}",
+            params={"fields": "name,snapshot_id,tracks.total"},
+            headers={"If-None-Match": etag} if etag else None,
+        )
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise PlaylistImportError("Playlist not found", status=404)
+        data = response.json()
+        return {
+            "name": data["name"],
+            "snapshot": data.get("snapshot_id", ""),
+            "etag": response.headers.get("etag", ""),
+            "total": data["tracks"]["total"],
+        }
+
+    async def fetch_tracks(self, playlist_id, total, report):
+        """
+        All tracks of the playlist; pages are requested concurrently since
+        their offsets are known from total up front. If one page fails the
+        others are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def page(offset):
+            async with semaphore:
+                response = await self.service.get_async(
+                    f"/playlists/{playlist_id}/tracks",
+                    params={"offset": offset, "limit": self.PAGE_SIZE, "fields": self.ITEM_FIELDS},
+                )
+            if response.status_code != 200:
+                raise PlaylistImportError(f"Spotify returned {response.status_code}")
+            page_items = response.json().get("items", [])
+            # total counts every item, so progress does too.
+            report(len(page_items))
+            items = [
+                item["track"]
+                for item in page_items
+                # Skip podcast episodes and local files (no id).
+                if item.get("track") and item["track"].get("id")
+                and item["track"].get("type", "track") == "track"
+            ]
+            return _normalize(items, normalize_spotify_track)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                pages = [
+                    group.create_task(page(offset))
+                    for offset in range(0, total, self.PAGE_SIZE)
+                ]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]
+        return [track for page_task in pages for track in page_task.result()]
+
+
+class SoundCloudPlaylistSource:
+    platform = "soundcloud"
+    PAGE_SIZE = 200
+
+    def __init__(self, access_token):
+        self.service = SoundCloudService(access_token)
+
+    async def fetch_meta(self, playlist_id, etag=""):
+        """
+        Same as SpotifyPlaylistSource.fetch_meta; last_modified serves as
+        the snapshot.
+        """
+        response = await self.service.get_async(
+            f"/playlists/soundcloud:playlists:{playlist_id}",
+            params={"access": "playable", "show_tracks": "false"},
+            headers={"If-None-Match": etag} if etag else None,
+        )
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise PlaylistImportError("Playlist not found", status=404)
+        data = response.json()
+        return {
+            "name": data["title"],
+            "snapshot": data.get("last_modified", ""),
+            "etag": response.headers.get("etag", ""),
+            "total": data.get("track_count", 0),
+        }
+
+    async def fetch_tracks(self, playlist_id, total, report):
+        """
+        All tracks of the playlist. SoundCloud pages by cursor (next_href),
+        so pages are fetched one after another.
+        """
+        tracks = []
+        path = f"/playlists/soundcloud:playlists:{playlist_id}/tracks"
+        params = {"access": "playable", "linked_partitioning": "true", "limit": self.PAGE_SIZE}
+        while path:
+            response = await self.service.get_async(path, params=params)
+            if response.status_code != 200:
+                raise PlaylistImportError(f"SoundCloud returned {response.status_code}")
+            data = response.json()
+            items = data.get("collection", []) if isinstance(data, dict) else data
+            report(len(items))
+            tracks.extend(_normalize(items, normalize_soundcloud_track))
+
+            next_href = data.get("next_href") if isinstance(data, dict) else None
+            # next_href already carries the cursor and the original params.
+            path = next_href.removeprefix(self.service.BASE_URL) if next_href else None
+            params = None
+        return tracks
+
+
+SOURCES = {
+    "spotify": SpotifyPlaylistSource,
+    "soundcloud": SoundCloudPlaylistSource,
+}
+
+
+async def import_playlist(source, user, playlist_id):
+    """
+    Import a provider playlist for user, yielding ("progress", {fetched,
+    total}) as pages arrive and finally ("done", {...}) with the saved
+    playlist. Raises PlaylistImportError when the upstream playlist cannot
+    be read.
+    """
+    meta = await source.fetch_meta(playlist_id)
+    progress = asyncio.Queue()
+    fetched = 0
+
+    fetch = asyncio.ensure_future(
+        source.fetch_tracks(playlist_id, meta["total"], progress.put_nowait)
+    )
+    try:
+        while True:
+            get = asyncio.ensure_future(progress.get())
+            done, _ = await asyncio.wait({fetch, get}, return_when=asyncio.FIRST_COMPLETED)
+            if get not in done:
+                get.cancel()
+                break
+            fetched += get.result()
+            yield "progress", {"fetched": fetched, "total": meta["total"]}
+        tracks = fetch.result()
+
+        if not progress.empty():
+            while not progress.empty():
+                fetched += progress.get_nowait()
+            yield "progress", {"fetched": fetched, "total": meta["total"]}
+    finally:
+        fetch.cancel()
+
+    playlist, created, changes = await sync_to_async(save_import)(
+        user, source.platform, playlist_id, meta, tracks
+    )
+    yield "done", {
+        "playlist": str(playlist.slug),
+        "created": created,
+        "tracks": len(tracks),
+        "changes": changes,
+    }
+
+
+def save_import(user, platform, playlist_id, meta, tracks_data):
+    """
+    Create or update the user's copy of an upstream playlist so it holds
+    exactly tracks_data in upstream order, in one transaction. Returns the
+    playlist, whether it was created, and the applied track changes.
+    """
+    from ..models import Playlist, Track
+
+    with transaction.atomic():
+        tracks = Track.objects.bulk_resolve(tracks_data)
+        playlist, created = Playlist.objects.select_for_update().get_or_create(
+            owner=user,
+            source_platform=platform,
+            source_id=playlist_id,
+            defaults={"name": meta["name"]},
+        )
+        changes = playlist.sync_tracks(tracks)
+
+        playlist.name = meta["name"]
+        playlist.source_snapshot = meta["snapshot"]
+        playlist.source_etag = meta["etag"]
+        playlist.synced_at = timezone.now()
+        playlist.sync_failures = 0
+        playlist.sync_retry_at = None
+        playlist.save(update_fields=[
+            "name", "source_snapshot", "source_etag", "synced_at", "sync_failures", "sync_retry_at",
+        ])
+    return playlist, created, changes
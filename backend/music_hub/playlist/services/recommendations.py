@@ -1,7 +1,10 @@
 import asyncio
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from .ai import AIAnalyzer
+from .ai import INSIGHT_FIELDS, AIAnalyzer
+from .analysis_cache import analysis_cache
+from .resolver import SuggestionResolver
 from spotify.services.spotify import SpotifyService
 from soundcloud.services.soundcloud import SoundCloudService
 
@@ -12,35 +15,153 @@ class RecommendationService:
         self.soundcloud = SoundCloudService(soundcloud_token)
 
     async def get_intelligent_proposals(self, playlist_id):
-        playlist_tracks = await self._get_playlist_tracks(playlist_id)
-        ai_output = await AIAnalyzer.get_suggestions(playlist_tracks)
+        insight, proposals = None, []
+        async for event, data in self.stream_proposals(playlist_id):
+            if event == "insight":
+                insight = data
+            elif event == "proposal":
+                proposals.append(data)
 
+        proposals.sort(key=lambda proposal: proposal["index"])
+        return {
+            "insight": {
+                "mood": insight['mood'],
+                "genre": insight['genre']
+            },
+            "proposals": [
+                {"spotify": p["spotify"], "soundcloud": p["soundcloud"]}
+                for p in proposals
+            ]
+        }
+
+    async def stream_proposals(self, playlist_id):
+        """
+        Yield ("insight", {mood, genre}) once the playlist is analyzed,
+        ("proposal", {index, suggestion, spotify, soundcloud}) for each
+        suggestion as soon as its searches finish, and ("total", n) once the
+        number of suggestions is known.
+
+        With AI_STREAM_SUGGESTIONS the searches for a suggestion start as soon
+        as the model has written it, while the rest is still being generated.
+        """
+        playlist_pk, playlist_tracks, linked_tracks = await self._get_playlist_tracks(playlist_id)
+        resolver = SuggestionResolver(
+            {"spotify": self.spotify, "soundcloud": self.soundcloud},
+            playlist_tracks,
+            linked_tracks,
+        )
+
+        events = asyncio.Queue()
+        analysis = asyncio.ensure_future(
+            self._analyze(playlist_pk, playlist_tracks, events.put_nowait)
+        )
         tasks = []
-        for sug in ai_output['suggestions']:
-            query = f"{sug['artist']} {sug['title']}"
-            tasks.append(self.spotify.search_async(query))
-            tasks.append(self.soundcloud.search_async(query))
+        total, resolved, skipped = None, 0, 0
+        try:
+            while total is None or resolved + skipped < total:
+                event, data = await events.get()
+                if event == "suggestion":
+                    index, suggestion = data
+                    if resolver.in_playlist(suggestion):
+                        skipped += 1
+                        continue
+                    task = asyncio.ensure_future(self._resolve(resolver, index, suggestion))
+                    task.add_done_callback(
+                        lambda done: events.put_nowait(("resolved", done))
+                    )
+                    tasks.append(task)
+                elif event == "resolved":
+                    resolved += 1
+                    yield "proposal", data.result()
+                elif event == "failed":
+                    raise data
+                elif event == "total":
+                    # Every suggestion event precedes total, so skipped is final.
+                    total = data
+                    yield event, total - skipped
+                else:
+                    yield event, data
+        finally:
+            analysis.cancel()
+            for task in tasks:
+                task.cancel()
+            resolver.close()
+
+    async def _analyze(self, playlist_pk, playlist_tracks, emit):
+        """
+        Run the AI analysis, emitting insight, suggestion and total events as
+        they become known. A finished analysis is cached while the
+        playlist's track set is unchanged.
+        """
+        try:
+            fingerprint = analysis_cache.fingerprint(t['id'] for t in playlist_tracks)
+            cached = await analysis_cache.aget(playlist_pk, fingerprint)
+            if cached is not None:
+                source = self._replay(cached)
+            elif getattr(settings, "AI_STREAM_SUGGESTIONS", True):
+                source = AIAnalyzer.stream_suggestions(playlist_tracks)
+            else:
+                source = self._replay(await AIAnalyzer.get_suggestions(playlist_tracks))
 
-        all_results = await asyncio.gather(*tasks)
+            fields, suggestions, failed = {}, [], False
+            async for kind, value in source:
+                if kind == "suggestion":
+                    emit(("suggestion", (len(suggestions), value)))
+                    suggestions.append(value)
+                elif kind == "error":
+                    failed = True
+                elif kind in INSIGHT_FIELDS and kind not in fields:
+                    fields[kind] = value
+                    if len(fields) == len(INSIGHT_FIELDS):
+                        emit(("insight", dict(fields)))
 
-        formatted_proposals = []
+            if len(fields) < len(INSIGHT_FIELDS):
+                failed = True
+                emit(("insight", {f: fields.get(f, "Unknown") for f in INSIGHT_FIELDS}))
+            if cached is None and not failed:
+                await analysis_cache.aset(
+                    playlist_pk, fingerprint, {**fields, "suggestions": suggestions}
+                )
+            # Last event: the stream may end as soon as the consumer has it.
+            emit(("total", len(suggestions)))
+        except Exception as e:
+            emit(("failed", e))
 
-        for i in range(0, len(all_results), 2):
-            formatted_proposals.append({
-                "spotify": all_results[i],
-                "soundcloud": all_results[i + 1]
-            })
+    @staticmethod
+    async def _replay(ai_output):
+        if ai_output.get("failed"):
+            yield "error", "AI analysis failed"
+        for field in INSIGHT_FIELDS:
+            yield field, ai_output.get(field, "Unknown")
+        for suggestion in ai_output.get('suggestions', []):
+            yield "suggestion", suggestion
 
+    async def _resolve(self, resolver, index, suggestion):
+        tracks = await resolver.resolve(suggestion)
         return {
-            "insight": {
-                "mood": ai_output['mood'],
-                "genre": ai_output['genre']
-            },
-            "proposals": formatted_proposals
+            "index": index,
+            "suggestion": suggestion,
+            "spotify": tracks["spotify"],
+            "soundcloud": tracks["soundcloud"],
         }
 
     @sync_to_async
     def _get_playlist_tracks(self, playlist_id):
-        from ..models import Playlist
+        """
+        The playlist's pk and tracks, plus the tracks on any platform linked
+        to the same recordings.
+        """
+        from ..models import Playlist, Track
         playlist = get_object_or_404(Playlist, slug=playlist_id)
-        return list(playlist.tracks.all().values('name', 'author'))
\ No newline at end of file
+        tracks = list(
+            playlist.tracks.all().values(
+                'id', 'track_id', 'platform', 'name', 'author', 'recording_id'
+            )
+        )
+        recordings = {t['recording_id'] for t in tracks if t['recording_id']}
+        linked = []
+        if recordings:
+            linked = list(
+                Track.objects.filter(recording__in=recordings).values('platform', 'track_id')
+            )
+        return playlist.pk, tracks, linked
@@ -0,0 +1,130 @@
+"""
+Resolver stage of RecommendationService: turns AI suggestions into provider
+tracks.
+
+Lookups are capped per provider by a semaphore, share one deadline budget
+per recommendation run (counted from the first lookup, so the model's
+latency doesn't use it up), and go through a cache keyed by (provider, artist,
+title) that is shared by all users. Suggestions already on the playlist are
+dropped before any network call is made, and hits for tracks linked to the
+same recording as a playlist track are dropped too.
+"""
+
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..recordings import fingerprint
+from .search import match_key
+
+DEFAULTS = {
+    "ALIAS": "search",
+    "CONCURRENCY": {"spotify": 4, "soundcloud": 4},
+    "BUDGET": 10.0,
+    "LOOKUP_TTL": 24 * 60 * 60,
+}
+DEFAULT_CONCURRENCY = 4
+
+
+def song_key(artist, title):
+    return match_key(artist), match_key(title)
+
+
+class SuggestionResolver:
+    def __init__(self, services, playlist_tracks, linked_tracks=()):
+        config = {**DEFAULTS, **getattr(settings, "RECOMMENDATION_RESOLVER", {})}
+        self.cache = caches[config["ALIAS"]]
+        self.ttl = config["LOOKUP_TTL"]
+        self.budget = config["BUDGET"]
+        self.deadline = None
+        self.services = services
+        self.semaphores = {
+            provider: asyncio.Semaphore(config["CONCURRENCY"].get(provider, DEFAULT_CONCURRENCY))
+            for provider in services
+        }
+
+        self.playlist_songs = set()
+        self.playlist_fingerprints = set()
+        self.playlist_ids = set()
+        for track in playlist_tracks:
+            for artist in track["author"].split(","):
+                self.playlist_songs.add(song_key(artist, track["name"]))
+            self.playlist_fingerprints.add(fingerprint(track["author"], track["name"]))
+            self.playlist_ids.add((track["platform"], str(track["track_id"])))
+        # Tracks linked to the same recordings as the playlist's tracks count
+        # as already on the playlist, whatever platform they are on.
+        self.playlist_ids.update(
+            (track["platform"], str(track["track_id"])) for track in linked_tracks
+        )
+        # An empty fingerprint (no name or artist) says nothing about the song.
+        self.playlist_fingerprints.discard("")
+
+        self.lookups = {}
+
+    def in_playlist(self, suggestion):
+        artist, title = suggestion["artist"], suggestion["title"]
+        return (
+            song_key(artist, title) in self.playlist_songs
+            or fingerprint(artist, title) in self.playlist_fingerprints
+        )
+
+    def cache_key(self, provider, suggestion):
+        artist, title = song_key(suggestion["artist"], suggestion["title"])
+        digest = hashlib.sha256(f"{artist}|{title}".encode()).hexdigest()
+        return f"lookup:{provider}:{digest}"
+
+    async def resolve(self, suggestion):
+        """
+        Best match per provider for a suggestion ({provider: track or None}).
+        Tracks already on the playlist come back as None.
+        """
+        providers = list(self.services)
+        results = await asyncio.gather(
+            *(self.lookup(provider, suggestion) for provider in providers)
+        )
+        return dict(zip(providers, results))
+
+    async def lookup(self, provider, suggestion):
+        if self.deadline is None:
+            self.deadline = time.monotonic() + self.budget
+        key = self.cache_key(provider, suggestion)
+        # Identical suggestions within a run share one lookup.
+        if key not in self.lookups:
+            self.lookups[key] = asyncio.ensure_future(self._lookup(provider, key, suggestion))
+        track = await asyncio.shield(self.lookups[key])
+
+        if track and (provider, str(track["id"])) in self.playlist_ids:
+            return None
+        return track
+
+    def close(self):
+        for lookup in self.lookups.values():
+            lookup.cancel()
+
+    async def _lookup(self, provider, key, suggestion):
+        track = await self.cache.aget(key)
+        if track is not None:
+            return track
+
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+
+        query = f"{suggestion['artist']} {suggestion['title']}"
+        try:
+            track = await asyncio.wait_for(self._search(provider, query), timeout=remaining)
+        except asyncio.TimeoutError:
+            return None
+
+        # search_async returns None for both "no match" and errors, so only
+        # hits are cached.
+        if track is not None:
+            await self.cache.aset(key, track, timeout=self.ttl)
+        return track
+
+    async def _search(self, provider, query):
+        async with self.semaphores[provider]:
+            return await self.services[provider].search_async(query)
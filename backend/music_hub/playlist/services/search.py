@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import re
+
+from django.conf import settings
+
+from music_hub.search_cache import search_cache
+from spotify.services.spotify import SpotifyService
+from soundcloud.services.soundcloud import SoundCloudService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 2.0
+# Reciprocal rank fusion constant: dampens the gap between adjacent ranks.
+RANK_CONSTANT = 60
+
+
+def normalize_spotify_track(item):
+    images = item.get("album", {}).get("images") or []
+    return {
+        "track_id": item["id"],
+        "name": item["name"],
+        "author": ", ".join(a["name"] for a in item.get("artists", [])) or "Unknown Artist",
+        "url": item["uri"],
+        "image_url": images[0]["url"] if images else "",
+        "track_duration": item.get("duration_ms", 0),
+        "platform": "spotify",
+    }
+
+
+def normalize_soundcloud_track(item):
+    user = item.get("user") or {}
+    return {
+        "track_id": str(item["id"]),
+        "name": item["title"],
+        "author": user.get("username") or "Unknown Artist",
+        "url": item.get("uri") or item.get("permalink_url"),
+        "image_url": item.get("artwork_url") or user.get("avatar_url") or "",
+        "track_duration": item.get("duration", 0),
+        "platform": "soundcloud",
+    }
+
+
+def match_key(text):
+    """
+    Loose identity of a title or artist: lower-cased, bracketed suffixes such
+    as "(Remastered)" or "[feat. X]" dropped, punctuation collapsed.
+    """
+    text = re.sub(r"[\(\[].*?[\)\]]", " ", text.lower())
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+class UnifiedSearchService:
+    """
+    Search Spotify and SoundCloud concurrently and merge the hits into one
+    ranked, deduplicated list of Track-shaped records. Each provider has its
+    own deadline; a slow or failing provider is reported and skipped.
+    """
+
+    def __init__(self, spotify_token=None, soundcloud_token=None):
+        self.providers = {}
+        if spotify_token:
+            self.providers["spotify"] = (
+                SpotifyService(spotify_token),
+                lambda data: data.get("tracks", {}).get("items", []),
+                normalize_spotify_track,
+            )
+        if soundcloud_token:
+            self.providers["soundcloud"] = (
+                SoundCloudService(soundcloud_token),
+                lambda data: data if isinstance(data, list) else data.get("collection", []),
+                normalize_soundcloud_track,
+            )
+
+    def deadline(self, provider):
+        deadlines = getattr(settings, "UNIFIED_SEARCH_DEADLINES", {})
+        return deadlines.get(provider, DEFAULT_DEADLINE)
+
+    async def search(self, query, limit=10):
+        names = list(self.providers)
+        outcomes = await asyncio.gather(
+            *(self._search_provider(name, query, limit) for name in names)
+        )
+
+        statuses = {}
+        ranked_lists = []
+        for name, (status, tracks) in zip(names, outcomes):
+            statuses[name] = status
+            ranked_lists.append(tracks)
+
+        return {
+            "query": query,
+            "results": self.merge(ranked_lists, query)[:limit],
+            "providers": statuses,
+        }
+
+    async def _search_provider(self, name, query, limit):
+        service, extract, normalize = self.providers[name]
+        try:
+            status_code, data = await asyncio.wait_for(
+                search_cache.aget_or_fetch(
+                    name, query, limit, lambda: service.search_tracks_async(query, limit)
+                ),
+                timeout=self.deadline(name),
+            )
+        except asyncio.TimeoutError:
+            return "timeout", []
+        except Exception as e:
+            logger.error(f"Unified search error for {name} '{query}': {e}")
+            return "error", []
+
+        if status_code != 200:
+            return "error", []
+
+        tracks = []
+        for item in extract(data):
+            try:
+                tracks.append(normalize(item))
+            except (KeyError, TypeError):
+                continue
+        return "ok", tracks
+
+    @staticmethod
+    def merge(ranked_lists, query):
+        """
+        Fuse per-provider rankings with reciprocal rank fusion, then boost
+        exact query-term matches. The same recording found on both providers
+        is returned once, with the other copy listed under "alternatives".
+        """
+        terms = set(match_key(query).split())
+        merged = {}
+
+        for tracks in ranked_lists:
+            for rank, track in enumerate(tracks):
+                key = (match_key(track["author"]), match_key(track["name"]))
+                score = 1 / (RANK_CONSTANT + rank)
+                entry = merged.get(key)
+                if entry is None:
+                    words = set(" ".join(key).split())
+                    entry = merged[key] = {
+                        **track,
+                        "alternatives": [],
+                        "score": len(terms & words) / len(terms) / RANK_CONSTANT if terms else 0,
+                    }
+                elif entry["platform"] != track["platform"] and not any(
+                    alt["platform"] == track["platform"] for alt in entry["alternatives"]
+                ):
+                    entry["alternatives"].append(
+                        {field: track[field] for field in ("platform", "track_id", "url")}
+                    )
+                else:
+                    continue
+                entry["score"] += score
+
+        results = sorted(merged.values(), key=lambda entry: entry["score"], reverse=True)
+        for entry in results:
+            entry["score"] = round(entry["score"], 6)
+        return results
@@ -0,0 +1,109 @@
+"""
+Incremental sync of imported playlists with their upstream source.
+
+Each playlist remembers the upstream ETag and snapshot (Spotify snapshot_id,
+SoundCloud last_modified) from its last sync. The metadata request is sent
+with If-None-Match, so an unchanged playlist costs one 304 and no track
+pages; a matching snapshot is treated the same way. Changed playlists are
+re-read and only the difference is written (Playlist.sync_tracks).
+
+Skipped (owner disconnected) and failed syncs are recorded too, and the
+playlist is left alone for an exponentially growing backoff, so broken
+playlists don't stay at the head of every sweep.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from soundcloud.views import get_valid_soundcloud_token
+from spotify.views import get_valid_spotify_token
+from .importer import SOURCES, save_import
+
+logger = logging.getLogger(__name__)
+
+TOKEN_GETTERS = {
+    "spotify": get_valid_spotify_token,
+    "soundcloud": get_valid_soundcloud_token,
+}
+
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+RETRY_BACKOFF = timedelta(minutes=15)
+MAX_RETRY_BACKOFF = timedelta(days=1)
+
+
+async def sync_playlist(playlist, access_token):
+    """
+    Bring one imported playlist up to date. Returns (outcome, changes).
+    """
+    source = SOURCES[playlist.source_platform](access_token)
+    meta = await source.fetch_meta(playlist.source_id, etag=playlist.source_etag)
+
+    if meta is None or (meta["snapshot"] and meta["snapshot"] == playlist.source_snapshot):
+        await sync_to_async(_mark_synced)(playlist, meta)
+        return UNCHANGED, None
+
+    tracks = await source.fetch_tracks(playlist.source_id, meta["total"], lambda count: None)
+    _, _, changes = await sync_to_async(save_import)(
+        playlist.owner, playlist.source_platform, playlist.source_id, meta, tracks
+    )
+    return UPDATED, changes
+
+
+async def sync_playlists(playlists, concurrency=8):
+    """
+    Sync many playlists with at most concurrency of them in flight at a time.
+    Returns a Counter of outcomes and a Counter of track changes summed over
+    the updated playlists.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    outcomes = Counter()
+    changes = Counter()
+
+    async def sync_one(playlist):
+        async with semaphore:
+            token = await sync_to_async(TOKEN_GETTERS[playlist.source_platform])(playlist.owner)
+            if not token:
+                outcome = SKIPPED
+            else:
+                try:
+                    outcome, playlist_changes = await sync_playlist(playlist, token)
+                    changes.update(playlist_changes or {})
+                except Exception as e:
+                    logger.error(f"Sync of playlist {playlist.slug} failed: {e}")
+                    outcome = FAILED
+            if outcome in (SKIPPED, FAILED):
+                await sync_to_async(_mark_failed)(playlist)
+            outcomes[outcome] += 1
+
+    await asyncio.gather(*(sync_one(playlist) for playlist in playlists))
+    return outcomes, changes
+
+
+def _mark_synced(playlist, meta):
+    playlist.synced_at = timezone.now()
+    playlist.sync_failures = 0
+    playlist.sync_retry_at = None
+    fields = ["synced_at", "sync_failures", "sync_retry_at"]
+    if meta is not None and meta["etag"]:
+        playlist.source_etag = meta["etag"]
+        fields.append("source_etag")
+    playlist.save(update_fields=fields)
+
+
+def _mark_failed(playlist):
+    now = timezone.now()
+    playlist.synced_at = now
+    playlist.sync_failures += 1
+    # The exponent is capped so a long-dead playlist can't overflow timedelta.
+    backoff = RETRY_BACKOFF * 2 ** min(playlist.sync_failures - 1, 16)
+    playlist.sync_retry_at = now + min(backoff, MAX_RETRY_BACKOFF)
+    playlist.save(update_fields=["synced_at", "sync_failures", "sync_retry_at"])
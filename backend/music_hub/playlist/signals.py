@@ -1,10 +1,51 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 from users.models import CustomUser
-from .models import Queue
+from .membership import membership
+from .models import Playlist, PlaylistTrack, Queue
+from .services.analysis_cache import analysis_cache
 
 
 @receiver(post_save, sender=CustomUser)
 def create_user_queue(sender, instance, created, **kwargs):
     if created:
         Queue.objects.create(user=instance)
+
+
+@receiver(m2m_changed, sender=PlaylistTrack)
+def place_added_tracks(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        PlaylistTrack.objects.place_unpositioned(pk_set if reverse else [instance.pk])
+
+
+@receiver(m2m_changed, sender=PlaylistTrack)
+def invalidate_playlist_analysis(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        analysis_cache.invalidate([instance.pk])
+    elif action == "pre_clear":
+        # pk_set is not provided on clear; collect the playlists beforehand.
+        analysis_cache.invalidate(instance.playlists.values_list("pk", flat=True))
+    elif pk_set:
+        analysis_cache.invalidate(pk_set)
+
+
+@receiver(m2m_changed, sender=Playlist.collaborators.through)
+@receiver(m2m_changed, sender=Playlist.followers.through)
+def invalidate_playlist_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        if action == "pre_clear":
+            membership.invalidate_playlist(instance.pk)
+        else:
+            membership.invalidate(instance.pk, pk_set)
+        return
+
+    # Reverse side: instance is the user, pk_set the playlists.
+    if action == "pre_clear":
+        field = "collaborators" if sender is Playlist.collaborators.through else "followers"
+        pk_set = Playlist.objects.filter(**{field: instance}).values_list("pk", flat=True)
+    for playlist_id in pk_set:
+        membership.invalidate(playlist_id, [instance.pk])
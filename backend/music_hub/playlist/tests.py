@@ -1 +1,1212 @@
-# Create your tests here.
+import asyncio
+import json
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from music_hub.token_cache import token_cache
+from soundcloud.models import SoundcloudToken
+from spotify.models import SpotifyToken
+from users.models import CustomUser
+from .membership import COLLABORATOR, FOLLOWER, NONE, OWNER, membership
+from .jobs import run_job
+from .models import (
+    QUEUE_ORDER_GAP,
+    QUEUE_ORDER_MAX,
+    Playlist,
+    PlaylistTrack,
+    QueueTrack,
+    RecommendationJob,
+    Track,
+)
+from .services.ai import AIAnalyzer, SuggestionStreamParser, client as ai_client
+from .services.analysis_cache import analysis_cache
+from .services.recommendations import RecommendationService
+from .views import PlaylistViewSet
+
+
+class PlaylistQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="owner@example.com", username="owner", password="secret"
+        )
+        self.other = CustomUser.objects.create_user(
+            email="other@example.com", username="other", password="secret"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_playlists(self, count, tracks_per_playlist):
+        for i in range(count):
+            playlist = Playlist.objects.create(
+                name=f"playlist {i}", owner=self.other, visibility="public"
+            )
+            tracks = Track.objects.bulk_resolve(
+                [
+                    {
+                        "track_id": f"{i}-{j}",
+                        "url": f"spotify:track:{i}-{j}",
+                        "name": f"track {j}",
+                        "author": "author",
+                    }
+                    for j in range(tracks_per_playlist)
+                ]
+            )
+            playlist.tracks.add(*tracks)
+            playlist.collaborators.add(self.user)
+            playlist.followers.add(self.user, self.other)
+
+    def assert_constant_queries(self, url):
+        self.create_playlists(2, 2)
+        with self.assertNumQueries(4) as small:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        self.create_playlists(10, 20)
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_query_count_is_constant(self):
+        response = self.assert_constant_queries(reverse("playlist-list"))
+        results = response.data["results"]
+        self.assertEqual(len(results), 12)
+        self.assertEqual(results[0]["tracks_count"], 20)
+        self.assertEqual(results[0]["followers_count"], 2)
+
+    def test_user_playlists_query_count_is_constant(self):
+        response = self.assert_constant_queries(reverse("playlist-user"))
+        self.assertEqual(len(response.data["results"]), 12)
+
+    def test_summary_view(self):
+        self.create_playlists(3, 4)
+        url = reverse("playlist-list")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"view": "summary", "page_size": 2})
+
+        self.assertEqual(len(response.data["results"]), 2)
+        summary = response.data["results"][0]
+        self.assertNotIn("tracks", summary)
+        self.assertEqual(summary["tracks_count"], 4)
+        self.assertEqual(summary["owner"]["username"], "other")
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    def test_only_detail_actions_prefetch(self):
+        for action, prefetched in [
+            ("retrieve", True),
+            ("destroy", False),
+            ("update", False),
+            ("partial_update", False),
+            ("follow_toggle", False),
+        ]:
+            queryset = PlaylistViewSet(action=action).plan_queryset(Playlist.objects.all())
+            self.assertEqual(bool(queryset._prefetch_related_lookups), prefetched, action)
+
+    def test_bulk_resolve_reuses_existing_tracks(self):
+        existing = Track.objects.create(track_id="1", url="spotify:track:1")
+        data = [
+            {"track_id": "2", "url": "https://soundcloud.com/a/b"},
+            {"track_id": "1", "url": "spotify:track:1"},
+            {"track_id": "2", "url": "https://soundcloud.com/a/b"},
+        ]
+
+        with self.assertNumQueries(3):
+            tracks = Track.objects.bulk_resolve(data)
+
+        self.assertEqual(tracks[1], existing)
+        self.assertEqual(tracks[0], tracks[2])
+        self.assertEqual(tracks[0].platform, "soundcloud")
+        self.assertEqual(Track.objects.count(), 2)
+
+    def test_create_playlist_with_known_tracks(self):
+        Track.objects.create(track_id="1", url="spotify:track:1", name="known")
+        track = {"track_id": "1", "url": "spotify:track:1", "name": "known"}
+
+        response = self.client.post(
+            reverse("playlist-list"),
+            {"name": "mix", "tracks": [track, track]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tracks_count"], 1)
+        self.assertEqual(Track.objects.count(), 1)
+
+
+class PlaylistTracksTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="owner@example.com", username="owner", password="secret"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.playlist = Playlist.objects.create(name="big", owner=self.user)
+        self.playlist.tracks.add(
+            *Track.objects.bulk_resolve(
+                [
+                    {"track_id": str(i), "url": f"spotify:track:{i}", "name": str(i)}
+                    for i in range(5)
+                ]
+            )
+        )
+        self.url = reverse("playlist-tracks", kwargs={"slug": self.playlist.slug})
+
+    def test_keyset_pagination(self):
+        response = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(
+            [track["name"] for track in response.data["results"]], ["0", "1", "2"]
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([track["name"] for track in response.data["results"]], ["3", "4"])
+        self.assertIsNone(response.data["next"])
+
+    def test_ndjson_stream(self):
+        response = self.client.get(self.url, {"stream": "true"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["name"] for line in lines], ["0", "1", "2", "3", "4"])
+
+
+class QueueBulkTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="owner@example.com", username="owner", password="secret"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tracks = [
+            {"track_id": str(i), "url": f"spotify:track:{i}", "name": str(i)}
+            for i in range(50)
+        ]
+
+    def queue_names(self):
+        return list(
+            QueueTrack.objects.filter(queue=self.user.queue)
+            .order_by("order")
+            .values_list("track__name", flat=True)
+        )
+
+    def test_replace_queue(self):
+        response = self.client.post(
+            reverse("queue-replace-queue"), {"tracks": self.tracks}, format="json"
+        )
+
+        self.assertEqual(response.data["count"], 50)
+        self.assertEqual(self.queue_names(), [str(i) for i in range(50)])
+        self.assertEqual(
+            list(QueueTrack.objects.order_by("order").values_list("order", flat=True)),
+            [i * QUEUE_ORDER_GAP for i in range(50)],
+        )
+
+    def test_replace_tracks_is_bulk(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks))
+        tracks = Track.objects.bulk_resolve(self.tracks[:3])
+
+        with self.assertNumQueries(3):
+            self.user.queue.replace_tracks(tracks)
+
+        self.assertEqual(self.queue_names(), ["0", "1", "2"])
+
+    def test_reorder_queue_is_bulk(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks))
+        ids = list(
+            QueueTrack.objects.order_by("-order").values_list("pk", flat=True)
+        )
+
+        # Savepoint, queue lock, read, one bulk UPDATE, release.
+        with self.assertNumQueries(5):
+            self.user.queue.reorder(ids)
+
+        self.assertEqual(self.queue_names(), [str(i) for i in reversed(range(50))])
+
+    def test_reorder_queue_partial_and_invalid(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks[:3]))
+        first, second, third = QueueTrack.objects.order_by("order")
+        url = reverse("queue-reorder-queue")
+
+        response = self.client.post(url, {"queue_track_ids": [third.pk]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.queue_names(), ["2", "0", "1"])
+
+        response = self.client.post(url, {"queue_track_ids": [first.pk, 999]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.queue_names(), ["2", "0", "1"])
+
+    def test_move_is_single_row_update(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks))
+        entries = list(QueueTrack.objects.order_by("order"))
+
+        with self.assertNumQueries(2):
+            entries[40].place_below(entries[2])
+
+        with self.assertNumQueries(2):
+            entries[0].place_last()
+
+        names = self.queue_names()
+        self.assertEqual(names[:4], ["1", "2", "40", "3"])
+        self.assertEqual(names[-1], "0")
+
+    def test_move_renumbers_when_gap_runs_out(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks[:3]))
+        first, second, third = QueueTrack.objects.order_by("order")
+        QueueTrack.objects.filter(pk=second.pk).update(order=1)
+        second.refresh_from_db()
+
+        third.place_below(first)
+
+        self.assertEqual(self.queue_names(), ["0", "2", "1"])
+        orders = list(QueueTrack.objects.order_by("order").values_list("order", flat=True))
+        self.assertTrue(all(b - a > 1 for a, b in zip(orders, orders[1:])))
+
+    def test_orders_are_renumbered_before_passing_the_maximum(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks[:3]))
+        first, second, third = QueueTrack.objects.order_by("order")
+        QueueTrack.objects.filter(pk=third.pk).update(order=QUEUE_ORDER_MAX)
+        third.refresh_from_db()
+
+        (track,) = Track.objects.bulk_resolve(self.tracks[3:4])
+        QueueTrack.objects.create(queue=self.user.queue, track=track)
+        first.place_last()
+
+        self.assertEqual(self.queue_names(), ["1", "2", "3", "0"])
+        orders = list(QueueTrack.objects.order_by("order").values_list("order", flat=True))
+        self.assertEqual(orders, [i * QUEUE_ORDER_GAP for i in range(1, 5)])
+
+    def test_moves_that_cannot_fit_after_renumbering_raise(self):
+        self.user.queue.replace_tracks(Track.objects.bulk_resolve(self.tracks[:3]))
+        first, second, third = QueueTrack.objects.order_by("order")
+
+        with mock.patch("playlist.models.QUEUE_ORDER_MAX", 2 * QUEUE_ORDER_GAP):
+            with self.assertRaises(ValueError):
+                first.place_last()
+            with self.assertRaises(ValueError):
+                first.place_below(third)
+        self.assertEqual(self.queue_names(), ["0", "1", "2"])
+
+
+class TrackCatalogSearchTests(TestCase):
+    def test_index_follows_bulk_writes_updates_and_deletes(self):
+        Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "Around the World", "author": "Daft Punk"},
+            {"track_id": "2", "url": "spotify:track:2", "name": "World Music", "author": "Someone"},
+            {"track_id": "3", "url": "https://soundcloud.com/x/3", "name": "Around", "author": "Daft Punk"},
+        ])
+
+        hits = Track.objects.search("daft worl")
+        self.assertEqual([t.track_id for t in hits], ["1"])
+        self.assertEqual(
+            [t.track_id for t in Track.objects.search("daft punk", platform="soundcloud")], ["3"]
+        )
+
+        Track.objects.filter(track_id="2").update(name="Renamed")
+        self.assertEqual([t.track_id for t in Track.objects.search("world")], ["1"])
+
+        Track.objects.filter(track_id="1").delete()
+        self.assertEqual(Track.objects.search("world"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "AND OR NOT", "author": "x"},
+        ])
+        self.assertEqual(len(Track.objects.search('"and" (or) not*')), 1)
+        self.assertEqual(Track.objects.search("  --  "), [])
+
+
+class RecordingIndexTests(TestCase):
+    def resolve(self, *tracks_data):
+        return Track.objects.bulk_resolve(list(tracks_data))
+
+    def test_equivalent_tracks_are_linked_across_platforms(self):
+        spotify, soundcloud, live, other = self.resolve(
+            {"track_id": "s1", "url": "spotify:track:s1", "name": "Around the World",
+             "author": "Daft Punk", "track_duration": 429000},
+            {"track_id": "1", "url": "https://api.soundcloud.com/tracks/1",
+             "name": "Daft Punk - Around The World (Official Audio)", "author": "daftpunk",
+             "track_duration": 431000},
+            {"track_id": "2", "url": "https://api.soundcloud.com/tracks/2",
+             "name": "Around the World", "author": "Daft Punk", "track_duration": 540000},
+            {"track_id": "3", "url": "https://soundcloud.com/x/3", "name": "Around the Block",
+             "author": "Someone", "track_duration": 429000},
+        )
+
+        out = StringIO()
+        call_command("link_recordings", stdout=out)
+        self.assertIn("Linked 4 tracks", out.getvalue())
+
+        for track in (spotify, soundcloud, live):
+            track.refresh_from_db()
+        self.assertEqual(list(spotify.equivalents()), [soundcloud])
+        self.assertEqual(list(soundcloud.equivalents()), [spotify])
+        # Same title, clearly different length: a different recording.
+        self.assertEqual(list(live.equivalents()), [])
+
+        call_command("link_recordings", stdout=out)
+        self.assertIn("Linked 0 tracks", out.getvalue())
+
+    def test_different_recordings_are_not_linked(self):
+        tracks = self.resolve(*[
+            {"track_id": str(i), "url": f"spotify:track:{i}", "name": name,
+             "author": author, "track_duration": 200000}
+            for i, (name, author) in enumerate([
+                ("Love", "Drake"),
+                ("Love Song", "Drake"),
+                ("Around the World", "Daft Punk"),
+                ("Around the World (Remix)", "Daft Punk"),
+                ("Around the World (Live at Wembley)", "Daft Punk"),
+                ("", ""),
+                ("", ""),
+            ])
+        ])
+
+        call_command("link_recordings", stdout=StringIO())
+
+        for track in tracks:
+            track.refresh_from_db()
+            self.assertEqual(list(track.equivalents()), [])
+
+    def test_platform_is_detected_from_the_host(self):
+        spotify, soundcloud, unknown = self.resolve(
+            {"track_id": "1", "url": "https://open.spotify.com/track/1"},
+            {"track_id": "1", "url": "https://m.soundcloud.com/a/b"},
+            {"track_id": "1", "url": "https://example.com/spotify/soundcloud"},
+        )
+        self.assertEqual(
+            [spotify.platform, soundcloud.platform, unknown.platform],
+            ["spotify", "soundcloud", "unknown"],
+        )
+
+
+class UnifiedSearchTests(TestCase):
+    def setUp(self):
+        caches["search"].clear()
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user", password="secret"
+        )
+        expires_at = timezone.now() + timedelta(hours=1)
+        SpotifyToken.objects.create(
+            user=self.user, access_token="a", refresh_token="r", expires_at=expires_at
+        )
+        SoundcloudToken.objects.create(
+            user=self.user, access_token="a", refresh_token="r", expires_at=expires_at
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def spotify_track(self, track_id, name, artist):
+        return {
+            "id": track_id,
+            "name": name,
+            "artists": [{"name": artist}],
+            "uri": f"spotify:track:{track_id}",
+            "album": {"images": []},
+            "duration_ms": 1000,
+        }
+
+    def soundcloud_track(self, track_id, title, username):
+        return {
+            "id": track_id,
+            "title": title,
+            "user": {"username": username},
+            "permalink_url": f"https://soundcloud.com/{username}/{track_id}",
+            "duration": 1000,
+        }
+
+    def test_results_are_merged_and_deduplicated(self):
+        spotify = mock.AsyncMock(return_value=(200, {"tracks": {"items": [
+            self.spotify_track("s1", "Around the World", "Daft Punk"),
+            self.spotify_track("s2", "Other Song", "Someone"),
+        ]}}))
+        soundcloud = mock.AsyncMock(return_value=(200, [
+            self.soundcloud_track(1, "Around The World (Remastered)", "daft punk"),
+        ]))
+        with mock.patch(
+            "playlist.services.search.SpotifyService.search_tracks_async", spotify
+        ), mock.patch(
+            "playlist.services.search.SoundCloudService.search_tracks_async", soundcloud
+        ):
+            response = self.client.get(reverse("unified-search"), {"q": "around the world"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["providers"], {"spotify": "ok", "soundcloud": "ok"})
+        results = response.data["results"]
+        self.assertEqual([r["track_id"] for r in results], ["s1", "s2"])
+        self.assertEqual(results[0]["alternatives"][0]["platform"], "soundcloud")
+
+    @override_settings(UNIFIED_SEARCH_DEADLINES={"spotify": 2.0, "soundcloud": 0.01})
+    def test_slow_provider_is_skipped(self):
+        async def slow(*args):
+            await asyncio.sleep(1)
+
+        spotify = mock.AsyncMock(return_value=(200, {"tracks": {"items": [
+            self.spotify_track("s1", "Around the World", "Daft Punk"),
+        ]}}))
+        with mock.patch(
+            "playlist.services.search.SpotifyService.search_tracks_async", spotify
+        ), mock.patch(
+            "playlist.services.search.SoundCloudService.search_tracks_async", side_effect=slow
+        ):
+            response = self.client.get(reverse("unified-search"), {"q": "daft punk"})
+
+        self.assertEqual(response.data["providers"], {"spotify": "ok", "soundcloud": "timeout"})
+        self.assertEqual([r["track_id"] for r in response.data["results"]], ["s1"])
+
+
+async def read_stream(response):
+    return b"".join([chunk async for chunk in response.streaming_content])
+
+
+def streamed_analysis(analysis):
+    async def stream(tracks_data):
+        yield "mood", analysis["mood"]
+        yield "genre", analysis["genre"]
+        for suggestion in analysis["suggestions"]:
+            yield "suggestion", suggestion
+
+    return mock.Mock(side_effect=stream)
+
+
+class SuggestionStreamParserTests(SimpleTestCase):
+    def test_suggestions_are_emitted_before_the_document_closes(self):
+        document = json.dumps({
+            "mood": "calm \"and\" quiet",
+            "genre": "ambient",
+            "suggestions": [
+                {"title": "Two {live}", "artist": "B"},
+                {"title": "Three", "artist": "C"},
+                {"title": "missing artist"},
+            ],
+        })
+        parser = SuggestionStreamParser()
+        events = []
+        for start in range(0, len(document) - 10, 7):
+            events.extend(parser.feed(document[start:start + 7]))
+
+        self.assertEqual(events, [
+            ("mood", 'calm "and" quiet'),
+            ("genre", "ambient"),
+            ("suggestion", {"title": "Two {live}", "artist": "B"}),
+            ("suggestion", {"title": "Three", "artist": "C"}),
+        ])
+
+
+    def test_only_top_level_fields_count_and_scanned_text_is_dropped(self):
+        document = json.dumps({
+            "suggestions": [{"title": "One", "artist": "A", "mood": "nested"}],
+            "mood": "calm",
+            "genre": "ambient",
+        })
+        parser = SuggestionStreamParser()
+        events = []
+        for char in document:
+            events.extend(parser.feed(char))
+            self.assertLess(len(parser.text), 60)
+
+        self.assertEqual(events, [
+            ("suggestion", {"title": "One", "artist": "A", "mood": "nested"}),
+            ("mood", "calm"),
+            ("genre", "ambient"),
+        ])
+
+class AnalysisCacheTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["search"].clear()
+        self.owner = CustomUser.objects.create_user(
+            email="owner@example.com", username="owner", password="secret"
+        )
+        self.playlist = Playlist.objects.create(name="Mix", owner=self.owner)
+        self.first, self.second = Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "One", "author": "A"},
+            {"track_id": "2", "url": "spotify:track:2", "name": "Two", "author": "B"},
+        ])
+        self.playlist.tracks.add(self.first)
+
+    def suggest(self):
+        service = RecommendationService(spotify_token="s", soundcloud_token="c")
+        return async_to_sync(service.get_intelligent_proposals)(self.playlist.slug)
+
+    def analyzer(self):
+        analysis = {"mood": "calm", "genre": "ambient", "suggestions": []}
+        return mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions",
+            streamed_analysis(analysis),
+        )
+
+    def test_unchanged_playlist_reuses_the_analysis(self):
+        with self.analyzer() as get_suggestions:
+            first = self.suggest()
+            second = self.suggest()
+
+        get_suggestions.assert_called_once()
+        self.assertEqual(first, second)
+
+    def test_track_changes_invalidate_the_analysis(self):
+        with self.analyzer() as get_suggestions:
+            self.suggest()
+            self.playlist.tracks.add(self.second)
+            self.assertIsNone(caches["default"].get(analysis_cache.key(self.playlist.pk)))
+            self.suggest()
+            self.second.playlists.clear()
+            self.assertIsNone(caches["default"].get(analysis_cache.key(self.playlist.pk)))
+            self.suggest()
+
+        self.assertEqual(get_suggestions.call_count, 3)
+
+
+    @override_settings(AI_STREAM_SUGGESTIONS=False)
+    def test_failed_analysis_is_neither_shared_nor_cached(self):
+        failing = mock.patch.object(
+            ai_client.chat.completions, "create", side_effect=RuntimeError("down")
+        )
+        with failing:
+            first = async_to_sync(AIAnalyzer.get_suggestions)([])
+            first["suggestions"].append({"title": "x", "artist": "y"})
+            second = async_to_sync(AIAnalyzer.get_suggestions)([])
+            self.suggest()
+
+        self.assertTrue(second["failed"])
+        self.assertEqual(second["suggestions"], [])
+        self.assertIsNone(caches["default"].get(analysis_cache.key(self.playlist.pk)))
+
+class SuggestionResolverTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["search"].clear()
+        self.owner = CustomUser.objects.create_user(
+            email="owner@example.com", username="owner", password="secret"
+        )
+        self.playlist = Playlist.objects.create(name="Mix", owner=self.owner)
+        self.playlist.tracks.add(*Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "One (Remastered)", "author": "A, Z"},
+        ]))
+
+    def suggest(self, suggestions, spotify, soundcloud=None):
+        analysis = {"mood": "calm", "genre": "ambient", "suggestions": suggestions}
+        service = RecommendationService(spotify_token="s", soundcloud_token="c")
+        with mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions",
+            streamed_analysis(analysis),
+        ), mock.patch(
+            "playlist.services.recommendations.SpotifyService.search_async", spotify
+        ), mock.patch(
+            "playlist.services.recommendations.SoundCloudService.search_async",
+            soundcloud or mock.AsyncMock(return_value=None),
+        ):
+            return async_to_sync(service.get_intelligent_proposals)(self.playlist.slug)
+
+    def test_playlist_tracks_are_filtered_before_searching(self):
+        spotify = mock.AsyncMock(side_effect=[{"id": "1"}, {"id": "2"}])
+        result = self.suggest(
+            [
+                {"title": "One", "artist": "Z"},
+                {"title": "Two", "artist": "B"},
+                {"title": "Three", "artist": "C"},
+            ],
+            spotify,
+        )
+
+        self.assertEqual(spotify.await_count, 2)
+        self.assertEqual(
+            sorted(str(p["spotify"]) for p in result["proposals"]), ["None", "{'id': '2'}"]
+        )
+
+    def test_lookups_are_shared_across_runs_and_suggestions(self):
+        spotify = mock.AsyncMock(return_value={"id": "2"})
+        suggestions = [{"title": "Two", "artist": "B"}, {"title": "two", "artist": "b"}]
+        self.suggest(suggestions, spotify)
+        caches["default"].clear()
+        result = self.suggest(suggestions, spotify)
+
+        spotify.assert_awaited_once()
+        self.assertEqual([p["spotify"] for p in result["proposals"]], [{"id": "2"}] * 2)
+
+    @override_settings(RECOMMENDATION_RESOLVER={"BUDGET": 0.05})
+    def test_lookups_past_the_budget_are_dropped(self):
+        async def slow(query):
+            await asyncio.sleep(1)
+
+        result = self.suggest([{"title": "Two", "artist": "B"}], mock.AsyncMock(side_effect=slow))
+
+        self.assertEqual(result["proposals"], [{"spotify": None, "soundcloud": None}])
+
+    @override_settings(RECOMMENDATION_RESOLVER={"BUDGET": 0.05})
+    def test_budget_starts_at_the_first_lookup(self):
+        async def slow_analysis(tracks_data):
+            await asyncio.sleep(0.2)
+            yield "suggestion", {"title": "Two", "artist": "B"}
+
+        service = RecommendationService(spotify_token="s", soundcloud_token="c")
+        with mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions",
+            mock.Mock(side_effect=slow_analysis),
+        ), mock.patch(
+            "playlist.services.recommendations.SpotifyService.search_async",
+            mock.AsyncMock(return_value={"id": "2"}),
+        ), mock.patch(
+            "playlist.services.recommendations.SoundCloudService.search_async",
+            mock.AsyncMock(return_value=None),
+        ):
+            result = async_to_sync(service.get_intelligent_proposals)(self.playlist.slug)
+
+        self.assertEqual(result["proposals"], [{"spotify": {"id": "2"}, "soundcloud": None}])
+
+
+class RecommendationJobTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        caches["search"].clear()
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user", password="secret"
+        )
+        SpotifyToken.objects.create(
+            user=self.user,
+            access_token="a",
+            refresh_token="r",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        self.playlist = Playlist.objects.create(name="Mix", owner=self.user)
+        self.playlist.tracks.add(*Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "One", "author": "A"},
+        ]))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def run_worker(self):
+        analysis = {
+            "mood": "calm",
+            "genre": "ambient",
+            "suggestions": [{"title": "Two", "artist": "B"}, {"title": "Three", "artist": "C"}],
+        }
+        with mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions",
+            streamed_analysis(analysis),
+        ), mock.patch(
+            "playlist.services.recommendations.SpotifyService.search_async",
+            mock.AsyncMock(return_value={"id": "s"}),
+        ), mock.patch(
+            "playlist.services.recommendations.SoundCloudService.search_async",
+            mock.AsyncMock(return_value=None),
+        ):
+            call_command("run_recommendation_jobs", "--once", stdout=StringIO())
+
+    def test_job_runs_in_worker_and_reports_progress(self):
+        started = self.client.post(
+            reverse("playlist-suggest-job", args=[self.playlist.slug])
+        )
+        self.assertEqual(started.status_code, 202)
+        self.assertEqual(started.data["status"], "pending")
+
+        self.run_worker()
+
+        job_url = reverse("suggest-job", args=[started.data["id"]])
+        job = self.client.get(job_url).data
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["insight"], {"mood": "calm", "genre": "ambient"})
+        self.assertEqual((job["total"], job["completed"]), (2, 2))
+        self.assertEqual(
+            sorted(p["suggestion"]["title"] for p in job["proposals"]), ["Three", "Two"]
+        )
+        self.assertEqual(len(self.client.get(job_url, {"after": 1}).data["proposals"]), 1)
+
+        events = self.client.get(
+            reverse("suggest-job-events", args=[started.data["id"]]),
+            HTTP_ACCEPT="text/event-stream",
+        )
+        body = async_to_sync(read_stream)(events).decode()
+        self.assertEqual(
+            [line for line in body.splitlines() if line.startswith("event:")],
+            ["event: insight", "event: proposal", "event: proposal", "event: done"],
+        )
+
+    def test_jobs_are_private_to_their_user(self):
+        started = self.client.post(
+            reverse("playlist-suggest-job", args=[self.playlist.slug])
+        )
+        other = CustomUser.objects.create_user(
+            email="other@example.com", username="other", password="secret"
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.get(reverse("suggest-job", args=[started.data["id"]]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse("suggest-job-events", args=[started.data["id"]]),
+            HTTP_ACCEPT="text/event-stream",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_stale_job_is_reclaimed_from_scratch(self):
+        job = RecommendationJob.objects.create(
+            user=self.user,
+            playlist=self.playlist,
+            status=RecommendationJob.RUNNING,
+            heartbeat_at=timezone.now() - timedelta(minutes=10),
+            insight={"mood": "old", "genre": "old"},
+            total=2,
+            proposals=[{"index": 0}],
+            error="boom",
+        )
+
+        self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.insight, {"mood": "calm", "genre": "ambient"})
+        self.assertEqual(len(job.proposals), 2)
+        self.assertEqual(job.error, "")
+
+    @override_settings(RECOMMENDATION_JOB_HEARTBEAT_INTERVAL=0)
+    def test_heartbeat_runs_during_analysis(self):
+        job = RecommendationJob.objects.create(
+            user=self.user, playlist=self.playlist, status=RecommendationJob.RUNNING
+        )
+
+        beats = []
+
+        async def slow_analysis(tracks_data):
+            await asyncio.sleep(0.05)
+            jobs = RecommendationJob.objects.filter(pk=job.pk)
+            beats.append(await jobs.values_list("heartbeat_at", flat=True).aget())
+            yield "error", "down"
+
+        with mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions", slow_analysis
+        ):
+            run_job(job)
+
+        self.assertIsNotNone(beats[0])
+
+    @override_settings(RECOMMENDATION_JOB_STREAM_TIMEOUT=0, RECOMMENDATION_JOB_POLL_INTERVAL=0)
+    def test_event_stream_times_out_on_unclaimed_job(self):
+        started = self.client.post(
+            reverse("playlist-suggest-job", args=[self.playlist.slug])
+        )
+
+        events = self.client.get(
+            reverse("suggest-job-events", args=[started.data["id"]]),
+            HTTP_ACCEPT="text/event-stream",
+        )
+
+        body = async_to_sync(read_stream)(events).decode()
+        self.assertIn("event: timeout", body)
+
+    def test_async_suggest_streams_proposals(self):
+        analysis = {
+            "mood": "calm",
+            "genre": "ambient",
+            "suggestions": [{"title": "Two", "artist": "B"}],
+        }
+        with mock.patch(
+            "playlist.services.recommendations.AIAnalyzer.stream_suggestions",
+            streamed_analysis(analysis),
+        ), mock.patch(
+            "playlist.services.recommendations.SpotifyService.search_async",
+            mock.AsyncMock(return_value={"id": "s"}),
+        ), mock.patch(
+            "playlist.services.recommendations.SoundCloudService.search_async",
+            mock.AsyncMock(return_value=None),
+        ):
+            response = self.client.get(
+                reverse("playlist-suggest-async", args=[self.playlist.slug]), {"stream": "true"}
+            )
+
+            async def read():
+                return b"".join([chunk async for chunk in response.streaming_content])
+
+            lines = [json.loads(line) for line in async_to_sync(read)().splitlines()]
+
+        events = {line["event"]: line["data"] for line in lines}
+        self.assertEqual(lines[-1]["event"], "done")
+        self.assertEqual(events["insight"], {"mood": "calm", "genre": "ambient"})
+        self.assertEqual(events["total"], 1)
+        self.assertEqual(events["proposal"]["spotify"], {"id": "s"})
+
+
+class PlaylistImportTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user", password="secret"
+        )
+        expires_at = timezone.now() + timedelta(hours=1)
+        SpotifyToken.objects.create(
+            user=self.user, access_token="a", refresh_token="r", expires_at=expires_at
+        )
+        SoundcloudToken.objects.create(
+            user=self.user, access_token="a", refresh_token="r", expires_at=expires_at
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def response(data, status_code=200, etag=""):
+        response = mock.Mock(status_code=status_code, headers={"etag": etag})
+        response.json.return_value = data
+        return response
+
+    def spotify_upstream(self, track_ids, name="Road trip", snapshot="s", etag="e1"):
+        def get(path, params=None, headers=None):
+            if path == "/playlists/p1":
+                if headers and headers.get("If-None-Match") == etag:
+                    return self.response(None, status_code=304)
+                return self.response(
+                    {"name": name, "snapshot_id": snapshot, "tracks": {"total": len(track_ids)}},
+                    etag=etag,
+                )
+            offset, limit = params["offset"], params["limit"]
+            return self.response({"items": [
+                # None stands for an item without a track (a removed episode...).
+                {"track": track_id and {
+                    "type": "track", "id": track_id, "name": f"Song {track_id}",
+                    "uri": f"spotify:track:{track_id}", "duration_ms": 1000,
+                    "artists": [{"name": "A"}], "album": {"images": []},
+                }}
+                for track_id in track_ids[offset:offset + limit]
+            ]})
+
+        return mock.patch(
+            "playlist.services.importer.SpotifyService.get_async",
+            mock.AsyncMock(side_effect=get),
+        )
+
+    def test_spotify_playlist_is_imported_then_updated(self):
+        url = reverse("playlist-import")
+        track_ids = [f"t{i}" for i in range(250)]
+        with self.spotify_upstream(track_ids) as get:
+            response = self.client.post(url, {"platform": "spotify", "playlist_id": "p1"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(get.await_count, 4)
+        playlist = Playlist.objects.get(slug=response.data["playlist"])
+        self.assertEqual(playlist.name, "Road trip")
+        self.assertEqual(playlist.tracks.count(), 250)
+
+        with self.spotify_upstream(track_ids[100:] + [None, "new"], name="Renamed"):
+            response = self.client.post(
+                url + "?stream=true", {"platform": "spotify", "playlist_id": "p1"}
+            )
+
+            async def read():
+                return b"".join([chunk async for chunk in response.streaming_content])
+
+            lines = [json.loads(line) for line in async_to_sync(read)().splitlines()]
+
+        self.assertEqual(lines[-2]["data"], {"fetched": 152, "total": 152})
+        self.assertEqual(lines[-1]["data"]["created"], False)
+        playlist.refresh_from_db()
+        self.assertEqual(playlist.name, "Renamed")
+        self.assertEqual(
+            set(playlist.tracks.values_list("track_id", flat=True)),
+            set(track_ids[100:] + ["new"]),
+        )
+        self.assertEqual(Playlist.objects.filter(owner=self.user).count(), 1)
+
+    def test_imported_tracks_keep_upstream_order(self):
+        track_ids = [f"t{i}" for i in range(30, 0, -1)]
+        with self.spotify_upstream(track_ids):
+            response = self.client.post(
+                reverse("playlist-import"), {"platform": "spotify", "playlist_id": "p1"}
+            )
+
+        entries = PlaylistTrack.objects.filter(
+            playlist__slug=response.data["playlist"]
+        ).order_by("position")
+        self.assertEqual([entry.track.track_id for entry in entries], track_ids)
+
+    def test_import_without_events_is_an_error(self):
+        async def no_events(source, user, playlist_id):
+            return
+            yield
+
+        with mock.patch("playlist.async_views.import_playlist", no_events):
+            response = self.client.post(
+                reverse("playlist-import"), {"platform": "spotify", "playlist_id": "p1"}
+            )
+
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("error", response.data)
+
+    def test_failed_page_cancels_the_others(self):
+        track_ids = [f"t{i}" for i in range(500)]
+        started, cancelled = [], []
+        upstream = self.spotify_upstream(track_ids)
+
+        async def get(path, params=None, headers=None):
+            if params and "offset" in params:
+                started.append(params["offset"])
+                if params["offset"] == 0:
+                    return self.response(None, status_code=500)
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(params["offset"])
+                    raise
+            return upstream.new.side_effect(path, params, headers)
+
+        with mock.patch(
+            "playlist.services.importer.SpotifyService.get_async", mock.AsyncMock(side_effect=get)
+        ):
+            response = self.client.post(
+                reverse("playlist-import"), {"platform": "spotify", "playlist_id": "p1"}
+            )
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(sorted(cancelled), sorted(set(started) - {0}))
+        self.assertTrue(cancelled)
+
+    def test_sync_skips_unchanged_playlists_and_applies_diffs(self):
+        track_ids = [f"t{i}" for i in range(5)]
+        with self.spotify_upstream(track_ids):
+            self.client.post(reverse("playlist-import"), {"platform": "spotify", "playlist_id": "p1"})
+        playlist = Playlist.objects.get(source_id="p1")
+        self.assertEqual((playlist.source_etag, playlist.source_snapshot), ("e1", "s"))
+
+        out = StringIO()
+        with self.spotify_upstream(track_ids) as get:
+            call_command("sync_playlists", stdout=out)
+        self.assertEqual(get.await_count, 1)
+        self.assertIn("1 unchanged", out.getvalue())
+
+        new_ids = ["t0", "t3", "t2", "t4", "new"]
+        with self.spotify_upstream(new_ids, snapshot="s2", etag="e2") as get:
+            call_command("sync_playlists", stdout=out)
+        self.assertIn("1 updated", out.getvalue())
+        self.assertIn("Tracks: 1 added, 1 removed, 1 moved", out.getvalue())
+
+        playlist.refresh_from_db()
+        self.assertEqual((playlist.source_etag, playlist.source_snapshot), ("e2", "s2"))
+        entries = PlaylistTrack.objects.filter(playlist=playlist).order_by("position")
+        self.assertEqual([entry.track.track_id for entry in entries], new_ids)
+
+    def test_skipped_and_failed_syncs_back_off(self):
+        with self.spotify_upstream(["t0"]):
+            self.client.post(reverse("playlist-import"), {"platform": "spotify", "playlist_id": "p1"})
+        playlist = Playlist.objects.get(source_id="p1")
+        SpotifyToken.objects.filter(user=self.user).delete()
+        token_cache.clear()
+
+        out = StringIO()
+        call_command("sync_playlists", stdout=out)
+        self.assertIn("1 skipped", out.getvalue())
+        playlist.refresh_from_db()
+        self.assertEqual(playlist.sync_failures, 1)
+        self.assertGreater(playlist.sync_retry_at, playlist.synced_at)
+
+        call_command("sync_playlists", stdout=out)
+        self.assertIn("Synced 0 playlists", out.getvalue())
+
+        Playlist.objects.filter(pk=playlist.pk).update(sync_retry_at=timezone.now())
+        SpotifyToken.objects.create(
+            user=self.user, access_token="a", refresh_token="r",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        with self.spotify_upstream(["t0"], etag="e2") as get:
+            get.side_effect = ValueError("upstream is down")
+            call_command("sync_playlists", stdout=out)
+        self.assertIn("1 failed", out.getvalue())
+        playlist.refresh_from_db()
+        self.assertEqual(playlist.sync_failures, 2)
+        self.assertEqual(playlist.sync_retry_at - playlist.synced_at, timedelta(minutes=30))
+
+        Playlist.objects.filter(pk=playlist.pk).update(sync_retry_at=timezone.now())
+        with self.spotify_upstream(["t0"]):
+            call_command("sync_playlists", stdout=out)
+        playlist.refresh_from_db()
+        self.assertEqual((playlist.sync_failures, playlist.sync_retry_at), (0, None))
+
+    def test_sync_tracks_writes_only_the_difference(self):
+        playlist = Playlist.objects.create(name="Mix", owner=self.user)
+        a, b, c, d, e = Track.objects.bulk_resolve([
+            {"track_id": key, "url": f"spotify:track:{key}"} for key in "abcde"
+        ])
+        playlist.sync_tracks([a, b, c, d])
+
+        def entries():
+            return dict(
+                PlaylistTrack.objects.filter(playlist=playlist).values_list("track_id", "pk")
+            ), dict(
+                PlaylistTrack.objects.filter(playlist=playlist).values_list("track_id", "position")
+            )
+
+        pks, positions = entries()
+        self.assertEqual(playlist.sync_tracks([a, c, d, e]), {"added": 1, "removed": 1, "moved": 0})
+        after_pks, after_positions = entries()
+        for track in (a, c, d):
+            self.assertEqual(after_pks[track.pk], pks[track.pk])
+            self.assertEqual(after_positions[track.pk], positions[track.pk])
+
+        pks, positions = after_pks, after_positions
+        self.assertEqual(playlist.sync_tracks([a, d, c, e]), {"added": 0, "removed": 0, "moved": 1})
+        after_pks, after_positions = entries()
+        self.assertEqual(after_pks, pks)
+        self.assertEqual(
+            sum(after_positions[key] != positions[key] for key in positions), 1
+        )
+        order = PlaylistTrack.objects.filter(playlist=playlist).order_by("position")
+        self.assertEqual(
+            list(order.values_list("track_id", flat=True)), [a.pk, d.pk, c.pk, e.pk]
+        )
+
+    def test_moving_a_track_to_the_top_updates_one_row(self):
+        playlist = Playlist.objects.create(name="Long", owner=self.user)
+        tracks = Track.objects.bulk_resolve([
+            {"track_id": str(i), "url": f"spotify:track:{i}"} for i in range(200)
+        ])
+        playlist.sync_tracks(tracks)
+        positions = dict(
+            PlaylistTrack.objects.filter(playlist=playlist).values_list("track_id", "position")
+        )
+
+        moved = [tracks[-1]] + tracks[:-1]
+        self.assertEqual(playlist.sync_tracks(moved), {"added": 0, "removed": 0, "moved": 1})
+        after = dict(
+            PlaylistTrack.objects.filter(playlist=playlist).values_list("track_id", "position")
+        )
+        self.assertEqual([key for key in positions if after[key] != positions[key]], [tracks[-1].pk])
+
+        playlist.tracks.add(*Track.objects.bulk_resolve([{"track_id": "x", "url": "spotify:track:x"}]))
+        response = self.client.get(reverse("playlist-detail", kwargs={"slug": playlist.slug}))
+        self.assertEqual(
+            [track["track_id"] for track in response.data["tracks"]],
+            [track.track_id for track in moved] + ["x"],
+        )
+
+    def test_soundcloud_playlist_follows_the_cursor(self):
+        def track(track_id):
+            return {
+                "id": track_id, "title": f"Song {track_id}", "user": {"username": "u"},
+                "permalink_url": f"https://soundcloud.com/u/{track_id}", "duration": 1000,
+            }
+
+        pages = {
+            "/playlists/soundcloud:playlists:7": self.response({"title": "Mix", "track_count": 3}),
+            "/playlists/soundcloud:playlists:7/tracks": self.response({
+                "collection": [track(1), track(2)],
+                "next_href": "https://api.soundcloud.com/playlists/soundcloud:playlists:7/tracks?cursor=2",
+            }),
+            "/playlists/soundcloud:playlists:7/tracks?cursor=2": self.response({
+                "collection": [track(3)], "next_href": None,
+            }),
+        }
+        with mock.patch(
+            "playlist.services.importer.SoundCloudService.get_async",
+            mock.AsyncMock(side_effect=lambda path, params=None, headers=None: pages[path]),
+        ):
+            response = self.client.post(
+                reverse("playlist-import"), {"platform": "soundcloud", "playlist_id": "7"}
+            )
+
+        self.assertEqual(response.status_code, 201)
+        playlist = Playlist.objects.get(slug=response.data["playlist"])
+        self.assertEqual(
+            sorted(playlist.tracks.values_list("track_id", flat=True)), ["1", "2", "3"]
+        )
+
+    def test_missing_upstream_playlist(self):
+        with mock.patch(
+            "playlist.services.importer.SpotifyService.get_async",
+            mock.AsyncMock(return_value=self.response({}, status_code=404)),
+        ):
+            response = self.client.post(
+                reverse("playlist-import"), {"platform": "spotify", "playlist_id": "nope"}
+            )
+        self.assertEqual(response.status_code, 404)
+
+
+class PlaylistMembershipTests(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.owner, self.member, self.fan = [
+            CustomUser.objects.create_user(
+                email=f"{name}@example.com", username=name, password="secret"
+            )
+            for name in ("owner", "member", "fan")
+        ]
+        self.playlist = Playlist.objects.create(
+            name="Mix", owner=self.owner, visibility="public"
+        )
+        self.playlist.collaborators.add(self.member)
+        self.client = APIClient()
+
+    def test_roles_take_one_query_and_are_cached(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(membership.role(self.owner, self.playlist), OWNER)
+        with self.assertNumQueries(1):
+            self.assertEqual(membership.role(self.member, self.playlist), COLLABORATOR)
+        with self.assertNumQueries(1):
+            self.assertEqual(membership.role(self.fan, self.playlist), NONE)
+        with self.assertNumQueries(0):
+            self.assertEqual(membership.role(self.member, self.playlist), COLLABORATOR)
+            self.assertTrue(self.playlist.can_edit(self.member))
+            self.assertFalse(self.playlist.can_edit(self.fan))
+
+        # Roles live in the cache every worker shares.
+        caches["shared"].clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(membership.role(self.member, self.playlist), COLLABORATOR)
+
+    def test_membership_changes_invalidate_cached_roles(self):
+        self.assertEqual(membership.role(self.fan, self.playlist), NONE)
+        self.playlist.followers.add(self.fan)
+        self.assertEqual(membership.role(self.fan, self.playlist), FOLLOWER)
+
+        self.fan.followers.remove(self.playlist)
+        self.assertEqual(membership.role(self.fan, self.playlist), NONE)
+
+        self.assertTrue(self.playlist.can_edit(self.member))
+        self.playlist.collaborators.clear()
+        self.assertFalse(self.playlist.can_edit(self.member))
+
+    def test_collaborator_who_follows_can_unfollow(self):
+        url = reverse("playlist-follow-toggle", kwargs={"slug": self.playlist.slug})
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.post(url).data["status"], "followed")
+        self.assertEqual(self.client.post(url).data["status"], "unfollowed")
+        self.assertFalse(self.playlist.followers.filter(pk=self.member.pk).exists())
+
+    def test_permission_check_uses_role(self):
+        url = reverse("playlist-detail", kwargs={"slug": self.playlist.slug})
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.patch(url, {"name": "Edited"}).status_code, 200)
+        self.assertEqual(self.client.delete(url).status_code, 403)
+
+        self.client.force_authenticate(self.fan)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.patch(url, {"name": "Nope"}).status_code, 403)
+
+    def test_follow_toggle_does_not_load_followers(self):
+        url = reverse("playlist-follow-toggle", kwargs={"slug": self.playlist.slug})
+        self.client.force_authenticate(self.fan)
+
+        response = self.client.post(url)
+        self.assertEqual(response.data, {"status": "followed", "followers_count": 1})
+
+        for i in range(20):
+            self.playlist.followers.add(
+                CustomUser.objects.create_user(
+                    email=f"f{i}@example.com", username=f"f{i}", password="secret"
+                )
+            )
+        with self.assertNumQueries(4):
+            response = self.client.post(url)
+        self.assertEqual(response.data, {"status": "unfollowed", "followers_count": 20})
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.post(url).status_code, 403)
@@ -1,13 +1,42 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PlaylistViewSet, QueueViewSet, add_track, suggest_songs
+from .views import (
+    PlaylistViewSet,
+    QueueViewSet,
+    add_track,
+    start_suggest_job,
+    suggest_job,
+    suggest_songs,
+    track_equivalents,
+)
+from . import async_views
 
 router = DefaultRouter()
 router.register(r"playlist", PlaylistViewSet, basename="playlist")
 router.register(r"queue", QueueViewSet, basename="queue")
 
 urlpatterns = [
+    # Before the router, whose playlist/<slug>/ route would match "import".
+    path("playlist/import/", async_views.import_provider_playlist, name="playlist-import"),
     path("", include(router.urls)),
     path("tracks/add_track/", add_track, name="add_track"),
+    path("tracks/<int:pk>/equivalents/", track_equivalents, name="track-equivalents"),
+    path("search/", async_views.unified_search, name="unified-search"),
     path("playlist/hub/<str:playlist_slug>/suggest/", suggest_songs, name="playlist-suggest"),
+    path(
+        "playlist/hub/<str:playlist_slug>/suggest/jobs/",
+        start_suggest_job,
+        name="playlist-suggest-job",
+    ),
+    path("suggest/jobs/<uuid:job_id>/", suggest_job, name="suggest-job"),
+    path(
+        "suggest/jobs/<uuid:job_id>/events/",
+        async_views.suggest_job_events,
+        name="suggest-job-events",
+    ),
+    path(
+        "async/playlist/hub/<str:playlist_slug>/suggest/",
+        async_views.suggest_songs,
+        name="playlist-suggest-async",
+    ),
 ]
@@ -1,17 +1,25 @@
-from asgiref.sync import async_to_sync
+import json
+from music_hub.http_clients import async_to_sync_scoped
+from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import Q
 
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
-from .models import Playlist, QueueTrack, Track, Queue
-from .serializers import PlaylistSerializer, QueueSerializer, TrackSerializer
+from .jobs import job_state
+from .models import Playlist, PlaylistTrack, QueueTrack, RecommendationJob, Track, Queue
+from .pagination import PlaylistCursorPagination, PlaylistTrackCursorPagination
+from .serializers import (
+    PlaylistSerializer,
+    PlaylistSummarySerializer,
+    QueueSerializer,
+    TrackSerializer,
+)
 from .permissions import IsOwnerOrCollaboratorOrReadOnly, IsOwnerOrStaffOnly
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from .services.recommendations import RecommendationService
 import logging
 from spotify.views import get_valid_spotify_token
@@ -28,53 +36,98 @@ class PlaylistViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'owner__username']
 
     lookup_field = 'slug'
+    pagination_class = PlaylistCursorPagination
 
-    def get_queryset(self):
-        user = self.request.user
-        queryset = Playlist.objects.all()
+    def is_summary_view(self):
+        return (
+            self.action in ('list', 'user')
+            and self.request.query_params.get('view') == 'summary'
+        )
 
-        access_condition = Q(owner=user) | Q(collaborators=user) | Q(followers=user)
+    def get_serializer_class(self):
+        if self.is_summary_view():
+            return PlaylistSummarySerializer
+        return PlaylistSerializer
 
-        if self.action == 'list':
-            return queryset.filter(
-                access_condition | Q(visibility="public")
-            ).distinct()
-        else:
-            return queryset.filter(
-                access_condition |
-                Q(visibility="public") |
-                Q(visibility="unlisted")
-            ).distinct()
+    # Actions that serialize playlists straight from the queryset. Updates
+    # are left out: DRF drops the prefetch cache after saving anyway.
+    detail_actions = ('list', 'user', 'retrieve')
 
+    def plan_queryset(self, queryset):
+        if self.is_summary_view():
+            return queryset.with_summary()
+        if self.action in self.detail_actions:
+            return queryset.with_details()
+        # tracks pages through the through table; destroy, update,
+        # follow_toggle and add_track never read the prefetched relations.
+        return queryset
+
+    def get_queryset(self):
+        return self.plan_queryset(
+            Playlist.objects.visible_to(
+                self.request.user, include_unlisted=self.action != 'list'
+            )
+        )
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
     @action(detail=False, methods=['get'])
     def user(self, request):
-        user = self.request.user
+        playlists = self.plan_queryset(
+            Playlist.objects.owned_or_followed_by(request.user)
+        )
 
-        playlists = Playlist.objects.filter(
-            Q(owner=user) |
-            Q(followers=user)
-        ).distinct()
+        page = self.paginate_queryset(playlists)
+        serializer = self.get_serializer(page, many=True)
 
-        serializer = PlaylistSerializer(playlists, many=True)
+        return self.get_paginated_response(serializer.data)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    @action(detail=True, methods=['get'])
+    def tracks(self, request, slug=None):
+        """
+        Tracks of a single playlist by position, keyset-paginated.
+        With ?stream=true the whole list is streamed as NDJSON instead.
+        """
+        playlist = self.get_object()
+        entries = (
+            PlaylistTrack.objects.filter(playlist=playlist)
+            .select_related('track')
+            .order_by('position', 'pk')
+        )
+
+        if request.query_params.get('stream') == 'true':
+            return StreamingHttpResponse(
+                self._stream_tracks(entries),
+                content_type='application/x-ndjson',
+            )
+
+        paginator = PlaylistTrackCursorPagination()
+        page = paginator.paginate_queryset(entries, request, view=self)
+        serializer = TrackSerializer([entry.track for entry in page], many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def _stream_tracks(entries, chunk_size=500):
+        for entry in entries.iterator(chunk_size=chunk_size):
+            data = TrackSerializer(entry.track).data
+            yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def follow_toggle(self, request, slug):
         user = request.user
         playlist = self.get_object()
 
-        if playlist.owner == user:
+        if playlist.owner_id == user.pk:
             return Response({"error": "You cannot follow your`s playlist"}, status=status.HTTP_403_FORBIDDEN)
 
         if playlist.visibility == "private":
             return Response({"error": "You cannot follow private playlists"}, status=status.HTTP_403_FORBIDDEN)
 
-        if user in playlist.followers.all():
+        # Ask about following directly rather than through the role, which
+        # ranks collaborator above follower: a collaborator who also follows
+        # must still be able to unfollow.
+        if playlist.followers.filter(pk=user.pk).exists():
             playlist.followers.remove(user)
             message = "unfollowed"
         else:
@@ -93,20 +146,22 @@ class PlaylistViewSet(viewsets.ModelViewSet):
                 {"error": "Track id is required"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        track = Track.objects.filter(
-            track_id=track_id,
-        ).first()
+        platform, track_id = Track.objects.lookup_key(request.data)
+        track = Track.objects.filter(platform=platform, track_id=track_id).first()
 
         if not track:
             track_data = request.data
             try:
-                track = Track.objects.create(
+                track, _ = Track.objects.get_or_create(
+                    platform=platform,
                     track_id=track_id,
-                    name=track_data['name'],
-                    author=track_data['author'],
-                    url=track_data['url'],
-                    track_duration=track_data['track_duration'],
-                    image_url=track_data['image_url']
+                    defaults={
+                        "name": track_data['name'],
+                        "author": track_data['author'],
+                        "url": track_data['url'],
+                        "track_duration": track_data['track_duration'],
+                        "image_url": track_data['image_url'],
+                    },
                 )
             except Exception as e:
                 return Response(
@@ -135,9 +190,11 @@ class QueueViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        for position, qt_id in enumerate(new_order):
-            qt = QueueTrack.objects.get(pk=qt_id, queue=queue)
-            qt.to(position)
+        try:
+            with transaction.atomic():
+                queue.reorder(new_order)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {"detail": "Queue reordered successfully"}, status=status.HTTP_200_OK
@@ -154,8 +211,7 @@ class QueueViewSet(viewsets.ModelViewSet):
 
         track = get_object_or_404(Track, pk=track_id)
 
-        qt = QueueTrack.objects.create(queue=queue, track=track)
-        qt.bottom()
+        QueueTrack.objects.create(queue=queue, track=track)
         return Response({"success": True}, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=["delete"])
@@ -186,7 +242,10 @@ class QueueViewSet(viewsets.ModelViewSet):
 
         qt = get_object_or_404(QueueTrack, pk=queue_track_id, queue=queue)
         target_qt = get_object_or_404(QueueTrack, pk=target_track_id, queue=queue)
-        qt.below(target_qt)
+        try:
+            qt.place_below(target_qt)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({"success": True}, status=status.HTTP_200_OK)
 
@@ -206,25 +265,7 @@ class QueueViewSet(viewsets.ModelViewSet):
 
         try:
             with transaction.atomic():
-                QueueTrack.objects.filter(queue=queue).delete()
-
-                for track_data in tracks_data:
-                    track = Track.objects.filter(
-                        track_id=track_data['track_id'],
-                        platform=track_data['platform']
-                    ).first()
-                    if not track:
-                        track = Track.objects.create(
-                            track_id=track_data['track_id'],
-                            platform=track_data['platform'],
-                            name=track_data['name'],
-                            author=track_data['author'],
-                            url=track_data['url'],
-                            track_duration=track_data['track_duration'],
-                            image_url=track_data['image_url']
-                        )
-
-                    QueueTrack.objects.create(queue=queue, track=track)
+                queue.replace_tracks(Track.objects.bulk_resolve(tracks_data))
 
             return Response({"status": "success", "count": len(tracks_data)}, status=status.HTTP_200_OK)
 
@@ -246,6 +287,18 @@ def add_track(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def track_equivalents(request, pk):
+    """
+    Endpoint: GET /api/tracks/<id>/equivalents/
+
+    The same recording on other platforms, from the recording index.
+    """
+    track = get_object_or_404(Track, pk=pk)
+    return Response(TrackSerializer(track.equivalents(), many=True).data)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def suggest_songs(request, playlist_slug):
@@ -261,10 +314,53 @@ def suggest_songs(request, playlist_slug):
     try:
         service = RecommendationService(spotify_token=spotify_token, soundcloud_token=soundcloud_token)
 
-        data = async_to_sync(service.get_intelligent_proposals)(playlist_slug)
+        data = async_to_sync_scoped(service.get_intelligent_proposals)(playlist_slug)
 
         return Response(data)
 
     except Exception as e:
         logger.error(f"Error in suggest_songs view: {e}")
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_suggest_job(request, playlist_slug):
+    """
+    Endpoint: POST /api/playlist/hub/<slug>/suggest/jobs/
+
+    Queues a recommendation job for the run_recommendation_jobs worker and
+    returns it right away; follow it with suggest_job or
+    async_views.suggest_job_events.
+    """
+    playlist = get_object_or_404(
+        Playlist.objects.visible_to(request.user, include_unlisted=True), slug=playlist_slug
+    )
+    if not get_valid_spotify_token(request.user):
+        return Response({'error': 'Spotify account not connected'}, status=status.HTTP_400_BAD_REQUEST)
+
+    job = RecommendationJob.objects.create(user=request.user, playlist=playlist)
+    return Response(job_state(job), status=status.HTTP_202_ACCEPTED)
+
+
+def _user_job(request, job_id):
+    return get_object_or_404(
+        RecommendationJob.objects.select_related('playlist'), pk=job_id, user=request.user
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def suggest_job(request, job_id):
+    """
+    Endpoint: GET /api/suggest/jobs/<id>/?after=<n>
+
+    Current state of a job. Proposals are listed in completion order,
+    skipping the first n so pollers only receive new ones.
+    """
+    try:
+        after = max(int(request.query_params.get('after', 0)), 0)
+    except ValueError:
+        return Response({'error': 'after must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(job_state(_user_job(request, job_id), after=after))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SoundcloudConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "soundcloud"
+
+    def ready(self):
+        from . import signals
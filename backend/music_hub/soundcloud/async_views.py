@@ -0,0 +1,110 @@
+"""
+Async counterparts of the SoundCloud proxy views, for the ASGI application.
+Upstream calls go through SoundCloudService's pooled httpx client, so a
+worker is not pinned while waiting on SoundCloud.
+"""
+
+from adrf.decorators import api_view
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseRedirect
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from music_hub.search_cache import search_cache
+from music_hub.token_cache import token_cache
+from .services.soundcloud import SoundCloudService
+from .utils import StreamResolutionError, stream_url_resolver
+from .views import SEARCH_LIMIT, catalog_items, get_valid_soundcloud_token, with_catalog_items
+
+
+async def aget_valid_soundcloud_token(user):
+    return await token_cache.aget("soundcloud", user.pk) or await sync_to_async(
+        get_valid_soundcloud_token
+    )(user)
+
+
+def proxy_response(response):
+    try:
+        data = response.json()
+    except ValueError:
+        return Response({"error": response.text}, status=500)
+
+    if response.status_code == 200:
+        return Response(data)
+    return Response(data, status=response.status_code)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def get_user_playlists(request):
+    soundcloud_token = await aget_valid_soundcloud_token(request.user)
+
+    response = await SoundCloudService(soundcloud_token).get_user_playlists_async()
+    return proxy_response(response)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def search(request):
+    query = request.GET.get("q")
+    if not query:
+        return Response({"error": "No search term provided"}, status=400)
+
+    soundcloud_token = await aget_valid_soundcloud_token(request.user)
+
+    if not soundcloud_token:
+        return Response({"error": "Soundcloud account not connected"}, status=400)
+
+    local_items = await sync_to_async(catalog_items)(query)
+    if len(local_items) >= SEARCH_LIMIT:
+        return Response(local_items)
+
+    service = SoundCloudService(soundcloud_token)
+    status_code, data = await search_cache.aget_or_fetch(
+        "soundcloud",
+        query,
+        SEARCH_LIMIT,
+        lambda: service.search_tracks_async(query, SEARCH_LIMIT),
+    )
+    return Response(with_catalog_items(status_code, data, local_items))
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+async def soundcloud_stream(request, track_id: str):
+    try:
+        return HttpResponseRedirect(await stream_url_resolver.aresolve(track_id))
+    except StreamResolutionError as e:
+        return HttpResponse(e.message, status=e.status)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def get_track_data(request):
+    track_id = request.GET.get("track_id")
+    if not track_id:
+        return Response({"error": "No track_id provided"}, status=400)
+
+    user_access_token = await aget_valid_soundcloud_token(request.user)
+
+    if not user_access_token:
+        return Response({"error": "Soundcloud account not connected"}, status=400)
+
+    response = await SoundCloudService(user_access_token).get_track_async(track_id)
+    return proxy_response(response)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def get_user_playlist_details(request, playlist_id: str):
+    user_access_token = await aget_valid_soundcloud_token(request.user)
+
+    if not user_access_token:
+        return Response({"error": "Soundcloud account not connected"}, status=400)
+
+    response = await SoundCloudService(user_access_token).get_playlist_async(playlist_id)
+
+    if response.status_code != 200:
+        return Response({"error": "Playlist not found"}, status=404)
+
+    return Response(response.json())
@@ -1,6 +1,5 @@
-import httpx
 import logging
-from django.conf import settings
+from music_hub.http_clients import get_async_client
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +10,34 @@ class SoundCloudService:
     def __init__(self, access_token):
         self.access_token = access_token
 
+    async def get_async(self, path, params=None, headers=None):
+        """
+        Raw GET against the SoundCloud API, returning the httpx response.
+        """
+        headers = {
+            "accept": "application/json; charset=utf-8",
+            "Authorization": f"OAuth {self.access_token}",
+            **(headers or {}),
+        }
+        client = get_async_client()
+        return await client.get(f"{self.BASE_URL}{path}", headers=headers, params=params)
+
+    async def search_tracks_async(self, query, limit=10):
+        params = {"q": query, "access": "playable", "limit": limit}
+        response = await self.get_async("/tracks", params=params)
+        return response.status_code, response.json()
+
+    async def get_user_playlists_async(self):
+        return await self.get_async("/me/playlists")
+
+    async def get_playlist_async(self, playlist_id):
+        return await self.get_async(
+            f"/playlists/soundcloud:playlists:{playlist_id}", params={"access": "playable"}
+        )
+
+    async def get_track_async(self, track_id):
+        return await self.get_async(f"/tracks/soundcloud:tracks:{track_id}")
+
     async def search_async(self, query, limit=5):
         headers = {
             "accept": "application/json",
@@ -23,30 +50,30 @@ class SoundCloudService:
             "access": "playable"
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/tracks",
-                    headers=headers,
-                    params=params
-                )
-                response.raise_for_status()
-                tracks = response.json()
-
-                if not tracks:
-                    return None
-
-                track = tracks[0]
-
-                return {
-                    "id": str(track["id"]),
-                    "name": track["title"],
-                    "artist": track["user"]["username"],
-                    "image_url": track.get("artwork_url") or track["user"].get("avatar_url"),
-                    "url": track["permalink_url"],
-                    "platform": "soundcloud",
-                    "track_duration": track.get("duration", 0)
-                }
-            except Exception as e:
-                logger.error(f"SoundCloud async search error for '{query}': {e}")
+        client = get_async_client()
+        try:
+            response = await client.get(
+                f"{self.BASE_URL}/tracks",
+                headers=headers,
+                params=params
+            )
+            response.raise_for_status()
+            tracks = response.json()
+
+            if not tracks:
                 return None
+
+            track = tracks[0]
+
+            return {
+                "id": str(track["id"]),
+                "name": track["title"],
+                "artist": track["user"]["username"],
+                "image_url": track.get("artwork_url") or track["user"].get("avatar_url"),
+                "url": track["permalink_url"],
+                "platform": "soundcloud",
+                "track_duration": track.get("duration", 0)
+            }
+        except Exception as e:
+            logger.error(f"SoundCloud async search error for '{query}': {e}")
+            return None
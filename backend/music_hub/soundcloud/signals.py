@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from music_hub.token_cache import token_cache
+from .models import SoundcloudToken
+
+
+@receiver(post_save, sender=SoundcloudToken)
+def cache_soundcloud_token(sender, instance, **kwargs):
+    token_cache.set("soundcloud", instance.user_id, instance.access_token, instance.expires_at)
+
+
+@receiver(post_delete, sender=SoundcloudToken)
+def invalidate_soundcloud_token(sender, instance, **kwargs):
+    token_cache.invalidate("soundcloud", instance.user_id)
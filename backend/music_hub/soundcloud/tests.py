@@ -1 +1,98 @@
-# Create your tests here.
+import base64
+import json
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from .utils import AppTokenProvider, StreamUrlResolver, signed_url_expiry
+
+
+class AppTokenProviderTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(0.05)
+        return f"token-{self.calls}", time.time() + 3600
+
+    def test_concurrent_cold_start_fetches_once(self):
+        # Two providers stand in for two workers sharing one cache.
+        providers = [AppTokenProvider(cache_alias="default") for _ in range(2)]
+        tokens = []
+
+        with mock.patch.object(AppTokenProvider, "_fetch", side_effect=self.fetch):
+            threads = [
+                threading.Thread(target=lambda p=p: tokens.append(p.get_token()))
+                for p in providers * 4
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(set(tokens), {"token-1"})
+
+    def test_token_is_renewed_early(self):
+        provider = AppTokenProvider(renew_before=300)
+        provider._store("old", time.time() + 200)
+
+        with mock.patch.object(AppTokenProvider, "_fetch", side_effect=self.fetch):
+            self.assertEqual(provider.get_token(), "token-1")
+            self.assertEqual(provider.get_token(), "token-1")
+
+        self.assertEqual(self.calls, 1)
+
+
+class StreamUrlResolverTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+
+    def signed_url(self, expires_at):
+        policy = {"Statement": [{"Condition": {"DateLessThan": {"AWS:EpochTime": expires_at}}}]}
+        encoded = base64.b64encode(json.dumps(policy).encode()).decode()
+        encoded = encoded.replace("+", "-").replace("=", "_").replace("/", "~")
+        return f"https://cf-media.sndcdn.com/a.128.mp3?Policy={encoded}&Signature=x"
+
+    def test_signed_url_expiry(self):
+        self.assertEqual(signed_url_expiry(self.signed_url(1700000000)), 1700000000)
+        self.assertEqual(signed_url_expiry("https://cdn.example.com/a.mp3?Expires=42"), 42)
+        self.assertIsNone(signed_url_expiry("https://cdn.example.com/a.mp3"))
+
+    def test_resolved_url_is_cached_until_it_expires(self):
+        url = self.signed_url(int(time.time()) + 600)
+        resolver = StreamUrlResolver()
+
+        with mock.patch.object(
+            StreamUrlResolver, "_resolve_upstream", return_value=(url, True)
+        ) as upstream, mock.patch.object(caches["default"], "set") as cache_set:
+            self.assertEqual(resolver.resolve("123"), url)
+
+        upstream.assert_called_once_with("123")
+        ttl = cache_set.call_args.kwargs["timeout"]
+        self.assertTrue(500 < ttl <= 540)
+
+    def test_concurrent_misses_resolve_once(self):
+        url = self.signed_url(int(time.time()) + 600)
+        resolver = StreamUrlResolver()
+        calls = []
+
+        def resolve_upstream(track_id):
+            calls.append(track_id)
+            time.sleep(0.05)
+            return url, True
+
+        with mock.patch.object(StreamUrlResolver, "_resolve_upstream", side_effect=resolve_upstream):
+            threads = [threading.Thread(target=resolver.resolve, args=("123",)) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(resolver.resolve("123"), url)
+
+        self.assertEqual(calls, ["123"])
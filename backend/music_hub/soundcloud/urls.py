@@ -1,10 +1,12 @@
 from django.urls import path
+from . import async_views
 from .views import (
     soundcloud_token_exchange,
     get_user_soundcloud_connection_status,
     soundcloud_disconnect,
     get_user_playlists,
     search,
+    search_cache_stats,
     soundcloud_stream,
     get_track_data,
     get_user_playlist_details,
@@ -20,6 +22,7 @@ urlpatterns = [
     path("disconnect/", soundcloud_disconnect, name="soundcloud_disconnect"),
     path("playlists/", get_user_playlists, name="get_user_playlists"),
     path("search/", search, name="soundcloud_search"),
+    path("search/stats/", search_cache_stats, name="soundcloud_search_cache_stats"),
     path("stream/<str:track_id>/", soundcloud_stream, name="soundcloud_stream"),
     path("get_track_data/", get_track_data, name="get_track_data"),
     path(
@@ -27,4 +30,18 @@ urlpatterns = [
         get_user_playlist_details,
         name="get_user_playlist_details",
     ),
+    # Async counterparts for the ASGI application.
+    path("async/playlists/", async_views.get_user_playlists, name="get_user_playlists_async"),
+    path("async/search/", async_views.search, name="soundcloud_search_async"),
+    path(
+        "async/stream/<str:track_id>/",
+        async_views.soundcloud_stream,
+        name="soundcloud_stream_async",
+    ),
+    path("async/get_track_data/", async_views.get_track_data, name="get_track_data_async"),
+    path(
+        "async/playlists/<str:playlist_id>",
+        async_views.get_user_playlist_details,
+        name="get_user_playlist_details_async",
+    ),
 ]
@@ -1,32 +1,215 @@
+import base64
+import json
+import threading
 import time
-import requests
+from urllib.parse import parse_qs, urlsplit
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import caches
+from music_hub.http_clients import provider_http
+from music_hub.single_flight import KeyedLock
 
 SC_CLIENT_ID = settings.SOUNDCLOUD_CLIENT_ID
 SC_CLIENT_SECRET = settings.SOUNDCLOUD_CLIENT_SECRET
 
-SC_TOKEN = None
-SC_EXPIRES_AT = 0
+
+class AppTokenProvider:
+    """
+    Client-credentials token for app-level SoundCloud calls.
+
+    The token is renewed `renew_before` seconds ahead of expiry. A thread lock
+    makes one thread per process fetch it. With a cache alias configured, the
+    token is also shared through that cache, and a cache.add() lock makes one
+    worker fetch it for everybody. Callers keep using the old token while
+    another worker renews it, as long as it has not expired yet.
+    """
+
+    CACHE_KEY = "soundcloud:app-token"
+    LOCK_KEY = "soundcloud:app-token:lock"
+    LOCK_TTL = 30
+    WAIT_TIMEOUT = 10
+    WAIT_INTERVAL = 0.1
+
+    def __init__(self, cache_alias=None, renew_before=300):
+        self.cache_alias = cache_alias
+        self.renew_before = renew_before
+        self._token = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias] if self.cache_alias else None
+
+    def _is_fresh(self, expires_at):
+        return time.time() < expires_at - self.renew_before
+
+    def get_token(self):
+        if self._token and self._is_fresh(self._expires_at):
+            return self._token
+
+        with self._lock:
+            if self._token and self._is_fresh(self._expires_at):
+                return self._token
+            if self.cache is None:
+                return self._store(*self._fetch())
+            return self._get_shared_token()
+
+    def _get_shared_token(self):
+        deadline = time.time() + self.WAIT_TIMEOUT
+        while True:
+            shared = self.cache.get(self.CACHE_KEY)
+            if shared and self._is_fresh(shared[1]):
+                return self._store(*shared)
+
+            if self.cache.add(self.LOCK_KEY, 1, timeout=self.LOCK_TTL):
+                try:
+                    token, expires_at = self._fetch()
+                    timeout = max(1, int(expires_at - time.time()))
+                    self.cache.set(self.CACHE_KEY, (token, expires_at), timeout=timeout)
+                    return self._store(token, expires_at)
+                finally:
+                    self.cache.delete(self.LOCK_KEY)
+
+            # Another worker is renewing; the current token is still usable.
+            current = shared or (self._token, self._expires_at)
+            if current[0] and time.time() < current[1]:
+                return self._store(*current)
+            if time.time() >= deadline:
+                return self._store(*self._fetch())
+            time.sleep(self.WAIT_INTERVAL)
+
+    def _store(self, token, expires_at):
+        self._token, self._expires_at = token, expires_at
+        return token
+
+    def _fetch(self):
+        now = time.time()
+        resp = provider_http.post(
+            "https://api.soundcloud.com/oauth2/token",
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data={
+                "grant_type": "client_credentials",
+                "client_id": SC_CLIENT_ID,
+                "client_secret": SC_CLIENT_SECRET,
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["access_token"], now + data.get("expires_in", 3600)
+
+
+app_token_provider = AppTokenProvider(
+    cache_alias=getattr(settings, "SOUNDCLOUD_APP_TOKEN_CACHE", None)
+)
 
 
 def get_app_sc_token():
-    global SC_TOKEN, SC_EXPIRES_AT
-    now = time.time()
-
-    if SC_TOKEN and now < SC_EXPIRES_AT - 60:
-        return SC_TOKEN
-
-    resp = requests.post(
-        "https://api.soundcloud.com/oauth2/token",
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        data={
-            "grant_type": "client_credentials",
-            "client_id": SC_CLIENT_ID,
-            "client_secret": SC_CLIENT_SECRET,
-        },
-    )
-    resp.raise_for_status()
-    data = resp.json()
-    SC_TOKEN = data["access_token"]
-    SC_EXPIRES_AT = now + data.get("expires_in", 3600)
-    return SC_TOKEN
+    return app_token_provider.get_token()
+
+
+def signed_url_expiry(url):
+    """
+    Expiry (epoch seconds) of a signed CDN url, read from its Expires
+    parameter or from the CloudFront Policy document; None if unknown.
+    """
+    query = parse_qs(urlsplit(url).query)
+    try:
+        if "Expires" in query:
+            return int(query["Expires"][0])
+        if "Policy" in query:
+            encoded = query["Policy"][0].replace("-", "+").replace("_", "=").replace("~", "/")
+            policy = json.loads(base64.b64decode(encoded))
+            return int(policy["Statement"][0]["Condition"]["DateLessThan"]["AWS:EpochTime"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+    return None
+
+
+class StreamResolutionError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class StreamUrlResolver:
+    """
+    Resolve a track id to its playable CDN url and cache it until shortly
+    before the signed url expires. Concurrent misses for the same track in
+    one process share a single upstream resolution.
+    """
+
+    CACHE_KEY = "soundcloud:stream:{}"
+
+    def __init__(self, cache_alias="default", expiry_margin=60, default_ttl=60):
+        self.cache_alias = cache_alias
+        self.expiry_margin = expiry_margin
+        self.default_ttl = default_ttl
+        self._single_flight = KeyedLock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def resolve(self, track_id):
+        key = self.CACHE_KEY.format(track_id)
+        url = self.cache.get(key)
+        if url:
+            return url
+
+        with self._single_flight(track_id):
+            url = self.cache.get(key)
+            if url:
+                return url
+
+            url, cacheable = self._resolve_upstream(track_id)
+            if cacheable:
+                ttl = self._ttl(url)
+                if ttl > 0:
+                    self.cache.set(key, url, timeout=ttl)
+            return url
+
+    async def aresolve(self, track_id):
+        url = await self.cache.aget(self.CACHE_KEY.format(track_id))
+        if url:
+            return url
+        # Misses are rare and single-flighted with threads, so run them in
+        # the executor rather than duplicating the resolution chain.
+        return await sync_to_async(self.resolve, thread_sensitive=False)(track_id)
+
+    def _ttl(self, url):
+        expires_at = signed_url_expiry(url)
+        if expires_at is None:
+            return self.default_ttl
+        return int(expires_at - time.time() - self.expiry_margin)
+
+    def _resolve_upstream(self, track_id):
+        headers = {
+            "accept": "application/json; charset=utf-8",
+            "Authorization": f"OAuth {get_app_sc_token()}",
+        }
+
+        resp = provider_http.get(
+            f"https://api.soundcloud.com/tracks/{track_id}/streams",
+            headers=headers
+        )
+        if resp.status_code != 200:
+            raise StreamResolutionError(f"Błąd SoundCloud: {resp.status_code}", resp.status_code)
+
+        stream_api_url = resp.json().get('http_mp3_128_url')
+        if not stream_api_url:
+            raise StreamResolutionError("Nie znaleziono http_mp3_128_url.", 404)
+
+        final_resp = provider_http.get(
+            stream_api_url,
+            headers=headers,
+            allow_redirects=False
+        )
+        if final_resp.status_code in [301, 302]:
+            return final_resp.headers.get('Location'), True
+
+        return stream_api_url, False
+
+
+stream_url_resolver = StreamUrlResolver()
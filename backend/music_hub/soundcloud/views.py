@@ -8,25 +8,71 @@ from django.conf import settings
 import requests
 from rest_framework.decorators import permission_classes, api_view
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from django.utils import timezone
 from datetime import timedelta
+from music_hub.http_clients import provider_http
+from music_hub.search_cache import search_cache
+from music_hub.token_cache import EXPIRY_MARGIN, token_cache
+from music_hub.token_refresh import TokenRefresher
+from playlist.catalog import top_up
+from playlist.models import Track
 from .models import SoundcloudToken
-from .utils import get_app_sc_token
+from .utils import StreamResolutionError, stream_url_resolver
 
 User = get_user_model()
 
+SEARCH_LIMIT = 10
+# Tokens this close to expiry are refreshed on use rather than handed out.
+REFRESH_AHEAD = timedelta(seconds=EXPIRY_MARGIN)
+
+
+def catalog_item(track):
+    """
+    Render a catalog Track in the shape of a SoundCloud search result item.
+    """
+    return {
+        "id": track.track_id,
+        "title": track.name,
+        "user": {"username": track.author},
+        "uri": track.url,
+        "permalink_url": track.url,
+        "artwork_url": track.image_url or "",
+        "duration": track.track_duration,
+    }
+
+
+def catalog_items(query):
+    tracks = Track.objects.search(query, platform="soundcloud", limit=SEARCH_LIMIT)
+    return [catalog_item(track) for track in tracks]
+
+
+def with_catalog_items(status_code, data, local_items):
+    """
+    Put catalog hits ahead of the SoundCloud tracks, topping up to
+    SEARCH_LIMIT with the SoundCloud hits not already among them.
+    """
+    if status_code != 200:
+        return local_items if local_items else data
+
+    if isinstance(data, dict):
+        items = top_up(local_items, data.get("collection", []), SEARCH_LIMIT)
+        return {**data, "collection": items}
+    return top_up(local_items, data, SEARCH_LIMIT)
+
 
 def get_valid_soundcloud_token(user):
+    access_token = token_cache.get("soundcloud", user.pk)
+    if access_token:
+        return access_token
+
     try:
         token_obj = SoundcloudToken.objects.get(user=user)
     except SoundcloudToken.DoesNotExist:
         return None
-    if token_obj.expires_at <= timezone.now():
-        resp = refresh_soundcloud_token(user)
-        if resp is None:
-            return None
-        token_obj.refresh_from_db()
+    if token_obj.expires_at <= timezone.now() + REFRESH_AHEAD:
+        return refresh_soundcloud_token(user)
+    token_cache.set("soundcloud", user.pk, token_obj.access_token, token_obj.expires_at)
     return token_obj.access_token
 
 
@@ -56,7 +102,7 @@ def soundcloud_token_exchange(request):
     }
 
     try:
-        response = requests.post(token_url, headers=headers, data=payload, timeout=10)
+        response = provider_http.post(token_url, headers=headers, data=payload, timeout=10)
         token_info = response.json()
 
     except requests.exceptions.RequestException:
@@ -90,12 +136,7 @@ def soundcloud_token_exchange(request):
     )
 
 
-@permission_classes([IsAuthenticated])
-def refresh_soundcloud_token(user):
-    token_obj = SoundcloudToken.objects.get(user=user)
-    if token_obj.expires_at > timezone.now():
-        return token_obj.access_token
-
+def request_soundcloud_token_refresh(refresh_token):
     refresh_url = "https://secure.soundcloud.com/oauth/token"
     headers = {
         "accept": "application/json; charset=utf-8",
@@ -105,23 +146,25 @@ def refresh_soundcloud_token(user):
         "grant_type": "refresh_token",
         "client_id": settings.SOUNDCLOUD_CLIENT_ID,
         "client_secret": settings.SOUNDCLOUD_CLIENT_SECRET,
-        "refresh_token": token_obj.refresh_token,
+        "refresh_token": refresh_token,
     }
 
-    response = requests.post(refresh_url, data=payload, headers=headers)
+    response = provider_http.post(refresh_url, data=payload, headers=headers)
 
     if response.status_code >= 400:
         return None
 
-    token_info = response.json()
-    new_access_token = token_info.get("access_token")
-    expires_in = token_info.get("expires_in", 3600)
+    return response.json()
+
+
+soundcloud_token_refresher = TokenRefresher(
+    "soundcloud", SoundcloudToken, request_soundcloud_token_refresh
+)
 
-    token_obj.access_token = new_access_token
-    token_obj.expires_at = timezone.now() + timedelta(seconds=int(expires_in))
-    token_obj.save()
 
-    return new_access_token
+@permission_classes([IsAuthenticated])
+def refresh_soundcloud_token(user):
+    return soundcloud_token_refresher.refresh(user.pk, ahead=REFRESH_AHEAD)
 
 
 @api_view(["GET"])
@@ -151,7 +194,7 @@ def soundcloud_disconnect(request):
         token_obj = SoundcloudToken.objects.get(user=request.user)
         token_obj.delete()
 
-        response = requests.post(
+        response = provider_http.post(
             "https://secure.soundcloud.com/sign-out",
             json={
                 "access_token": soundcloud_token,
@@ -179,7 +222,7 @@ def get_user_playlists(request):
         "Authorization": f"OAuth {soundcloud_token}",
     }
 
-    response = requests.get(url, headers=headers, timeout=10)
+    response = provider_http.get(url, headers=headers, timeout=10)
 
     try:
         user_data = response.json()
@@ -210,45 +253,33 @@ def search(request):
         "accept": "application/json; charset=utf-8",
         "Authorization": f"OAuth {soundcloud_token}",
     }
-    params = {"q": query, "access": "playable", "limit": 10}
-    response = requests.get(url, headers=headers, params=params)
-    return Response(response.json())
-
-
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def soundcloud_stream(request, track_id: str):
-    sc_token = get_app_sc_token()
-    headers = {
-        "accept": "application/json; charset=utf-8",
-        "Authorization": f"OAuth {sc_token}",
-    }
+    params = {"q": query, "access": "playable", "limit": SEARCH_LIMIT}
 
-    resp = requests.get(
-        f"https://api.soundcloud.com/tracks/{track_id}/streams",
-        headers=headers
-    )
+    def fetch():
+        response = provider_http.get(url, headers=headers, params=params)
+        return response.status_code, response.json()
 
-    if resp.status_code == 200:
-        data = resp.json()
-        stream_api_url = data.get('http_mp3_128_url')
+    local_items = catalog_items(query)
+    if len(local_items) >= SEARCH_LIMIT:
+        return Response(local_items)
 
-        if stream_api_url:
-            final_resp = requests.get(
-                stream_api_url,
-                headers=headers,
-                allow_redirects=False
-            )
+    status_code, data = search_cache.get_or_fetch("soundcloud", query, SEARCH_LIMIT, fetch)
+    return Response(with_catalog_items(status_code, data, local_items))
 
-            if final_resp.status_code in [301, 302]:
-                cdn_url = final_resp.headers.get('Location')
-                return HttpResponseRedirect(cdn_url)
 
-            return HttpResponseRedirect(stream_api_url)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def search_cache_stats(request):
+    return Response(search_cache.stats("soundcloud"))
 
-        return HttpResponse("Nie znaleziono http_mp3_128_url.", status=404)
 
-    return HttpResponse(f"Błąd SoundCloud: {resp.status_code}", status=resp.status_code)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def soundcloud_stream(request, track_id: str):
+    try:
+        return HttpResponseRedirect(stream_url_resolver.resolve(track_id))
+    except StreamResolutionError as e:
+        return HttpResponse(e.message, status=e.status)
 
 
 @api_view(["GET"])
@@ -267,7 +298,7 @@ def get_track_data(request):
         "accept": "application/json; charset=utf-8",
         "Authorization": f"OAuth {user_access_token}",
     }
-    response = requests.get(
+    response = provider_http.get(
         f"https://api.soundcloud.com/tracks/soundcloud:tracks:{track_id}",
         headers=headers,
     )
@@ -299,7 +330,7 @@ def get_user_playlist_details(request, playlist_id: str):
     params = {
         "access": "playable",
     }
-    response = requests.get(
+    response = provider_http.get(
         f"https://api.soundcloud.com/playlists/soundcloud:playlists:{playlist_id}",
         headers=headers,
         params=params,
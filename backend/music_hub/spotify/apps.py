@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpotifyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "spotify"
+
+    def ready(self):
+        from . import signals
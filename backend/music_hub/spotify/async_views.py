@@ -0,0 +1,72 @@
+"""
+Async counterparts of the Spotify proxy views, for the ASGI application.
+Upstream calls go through SpotifyService's pooled httpx client, so a worker
+is not pinned while waiting on Spotify.
+"""
+
+from adrf.decorators import api_view
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from music_hub.search_cache import search_cache
+from music_hub.token_cache import token_cache
+from .services.spotify import SpotifyService
+from .views import SEARCH_LIMIT, catalog_items, get_valid_spotify_token, with_catalog_items
+
+
+async def aget_valid_spotify_token(user):
+    return await token_cache.aget("spotify", user.pk) or await sync_to_async(
+        get_valid_spotify_token
+    )(user)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def search(request):
+    query = request.GET.get("q")
+    if not query:
+        return Response({"error": "No search term provided"}, status=400)
+
+    token = await aget_valid_spotify_token(request.user)
+    if not token:
+        return Response({"error": "Spotify account not connected"}, status=400)
+
+    local_items = await sync_to_async(catalog_items)(query)
+    if len(local_items) >= SEARCH_LIMIT:
+        return Response({"tracks": {"items": local_items}})
+
+    service = SpotifyService(token)
+    status_code, data = await search_cache.aget_or_fetch(
+        "spotify",
+        query,
+        SEARCH_LIMIT,
+        lambda: service.search_tracks_async(query, SEARCH_LIMIT),
+    )
+    return Response(with_catalog_items(status_code, data, local_items))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def get_user_playlists(request):
+    spotify_token = await aget_valid_spotify_token(request.user)
+    if not spotify_token:
+        return Response({"error": "Spotify account not connected"}, status=400)
+
+    response = await SpotifyService(spotify_token).get_user_playlists_async()
+    return Response(response.json())
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+async def get_user_playlist_details(request, playlist_id: str):
+    spotify_token = await aget_valid_spotify_token(request.user)
+    if not spotify_token:
+        return Response({"error": "Spotify account not connected"}, status=400)
+
+    response = await SpotifyService(spotify_token).get_playlist_async(playlist_id)
+
+    if response.status_code != 200:
+        return Response({"error": "Playlist not found"}, status=404)
+
+    return Response(response.json())
@@ -1,16 +1,37 @@
-import httpx
 import logging
+from music_hub.http_clients import get_async_client
 
 
 logger = logging.getLogger(__name__)
 
 
 class SpotifyService:
-    SEARCH_URL = "https://api.spotify.com/v1/search"
+    BASE_URL = "https://api.spotify.com/v1"
+    SEARCH_URL = f"{BASE_URL}/search"
 
     def __init__(self, access_token):
         self.headers = {"Authorization": f"Bearer {access_token}"}
 
+    async def get_async(self, path, params=None, headers=None):
+        """
+        Raw GET against the Web API, returning the httpx response.
+        """
+        client = get_async_client()
+        return await client.get(
+            f"{self.BASE_URL}{path}", headers={**self.headers, **(headers or {})}, params=params
+        )
+
+    async def search_tracks_async(self, query, limit=10):
+        params = {"q": query, "type": "track", "limit": limit}
+        response = await self.get_async("/search", params=params)
+        return response.status_code, response.json()
+
+    async def get_user_playlists_async(self):
+        return await self.get_async("/me/playlists")
+
+    async def get_playlist_async(self, playlist_id):
+        return await self.get_async(f"/playlists/{playlist_id}")
+
     async def search_async(self, query, limit=5):
         params = {
             "q": query,
@@ -18,25 +39,25 @@ class SpotifyService:
             "limit": limit
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(self.SEARCH_URL, headers=self.headers, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                tracks = data.get('tracks', {}).get('items', [])
-                if not tracks:
-                    return None
-
-                track = tracks[0]
-                return {
-                    "id": track["id"],
-                    "name": track["name"],
-                    "artist": track["artists"][0]["name"],
-                    "image_url": track["album"]["images"][0]["url"] if track["album"]["images"] else None,
-                    "uri": track["uri"],
-                    "external_url": track["external_urls"]["spotify"]
-                }
-            except Exception as e:
-                logger.error(f"Spotify async search error for '{query}': {e}")
-                return None
\ No newline at end of file
+        client = get_async_client()
+        try:
+            response = await client.get(self.SEARCH_URL, headers=self.headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            tracks = data.get('tracks', {}).get('items', [])
+            if not tracks:
+                return None
+
+            track = tracks[0]
+            return {
+                "id": track["id"],
+                "name": track["name"],
+                "artist": track["artists"][0]["name"],
+                "image_url": track["album"]["images"][0]["url"] if track["album"]["images"] else None,
+                "uri": track["uri"],
+                "external_url": track["external_urls"]["spotify"]
+            }
+        except Exception as e:
+            logger.error(f"Spotify async search error for '{query}': {e}")
+            return None
\ No newline at end of file
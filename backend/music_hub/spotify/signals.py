@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from music_hub.token_cache import token_cache
+from .models import SpotifyToken
+
+
+@receiver(post_save, sender=SpotifyToken)
+def cache_spotify_token(sender, instance, **kwargs):
+    token_cache.set("spotify", instance.user_id, instance.access_token, instance.expires_at)
+
+
+@receiver(post_delete, sender=SpotifyToken)
+def invalidate_spotify_token(sender, instance, **kwargs):
+    token_cache.invalidate("spotify", instance.user_id)
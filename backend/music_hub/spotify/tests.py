@@ -1 +1,252 @@
-# Create your tests here.
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import requests
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from requests.cookies import MockRequest, create_cookie
+from rest_framework.test import APIClient
+
+from music_hub.http_clients import (
+    async_to_sync_scoped,
+    build_async_client,
+    build_session,
+    get_async_client,
+)
+from music_hub.token_cache import TokenCache, token_cache
+from music_hub.token_refresh import TokenRefresher
+from playlist.models import Track
+from users.models import CustomUser
+from .models import SpotifyToken
+from .views import SEARCH_LIMIT, get_valid_spotify_token, spotify_token_refresher
+
+
+class ProviderClientTests(SimpleTestCase):
+    def test_scoped_clients_are_shared_within_a_call_and_closed_after_it(self):
+        async def clients():
+            return get_async_client(), get_async_client()
+
+        first, second = async_to_sync_scoped(clients)()
+
+        self.assertIs(first, second)
+        self.assertTrue(first.is_closed)
+
+    @override_settings(PROVIDER_HTTP_CLIENT={"HTTP2": True, "MAX_CONNECTIONS": 7})
+    def test_async_clients_use_http2_and_configured_limits(self):
+        pool = build_async_client()._transport._pool
+
+        self.assertTrue(pool._http2)
+        self.assertEqual(pool._max_connections, 7)
+
+    def test_shared_sessions_keep_no_cookies(self):
+        session = build_session()
+        request = requests.Request("GET", "https://accounts.spotify.com/api/token").prepare()
+
+        session.cookies.set_cookie_if_ok(
+            create_cookie("sid", "user-a", domain="accounts.spotify.com"), MockRequest(request)
+        )
+
+        self.assertEqual(len(session.cookies), 0)
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        caches["search"].clear()
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user", password="secret"
+        )
+        SpotifyToken.objects.create(
+            user=self.user,
+            access_token="access",
+            refresh_token="refresh",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upstream(self, status_code=200):
+        response = mock.Mock(status_code=status_code)
+        response.json.return_value = {"tracks": {"items": [{"id": "1"}]}}
+        return mock.patch("spotify.views.provider_http.get", return_value=response)
+
+    def test_normalized_queries_share_one_upstream_call(self):
+        with self.upstream() as get:
+            first = self.client.get(reverse("spotify_search"), {"q": "Daft Punk"})
+            second = self.client.get(reverse("spotify_search"), {"q": "  daft   punk "})
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(first.data, second.data)
+
+        admin = CustomUser.objects.create_superuser(
+            email="admin@example.com", username="admin", password="secret"
+        )
+        self.client.force_authenticate(admin)
+        stats = self.client.get(reverse("spotify_search_cache_stats")).data
+        self.assertEqual(stats, {"hits": 1, "stale_hits": 0, "misses": 1})
+
+    def test_async_search_shares_the_cache(self):
+        upstream = mock.AsyncMock(return_value=(200, {"tracks": {"items": []}}))
+        with mock.patch(
+            "spotify.async_views.SpotifyService.search_tracks_async", upstream
+        ):
+            first = self.client.get(reverse("spotify_search_async"), {"q": "Daft Punk"})
+            second = self.client.get(reverse("spotify_search_async"), {"q": "daft punk"})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.data, {"tracks": {"items": []}})
+        upstream.assert_awaited_once_with("Daft Punk", 10)
+
+    def test_catalog_hits_come_first_and_are_topped_up(self):
+        Track.objects.bulk_resolve([
+            {"track_id": "1", "url": "spotify:track:1", "name": "Da Funk", "author": "Daft Punk"},
+        ])
+        with self.upstream() as get:
+            response = self.client.get(reverse("spotify_search"), {"q": "daft punk"})
+
+        get.assert_called_once()
+        self.assertEqual([item["id"] for item in response.data["tracks"]["items"]], ["1"])
+
+        caches["search"].clear()
+        with self.upstream() as get:
+            get.return_value.json.return_value = {"tracks": {"items": [{"id": "2"}, {"id": "1"}]}}
+            response = self.client.get(reverse("spotify_search"), {"q": "daft punk"})
+        self.assertEqual([item["id"] for item in response.data["tracks"]["items"]], ["1", "2"])
+
+    def test_full_catalog_page_skips_the_provider(self):
+        Track.objects.bulk_resolve([
+            {"track_id": str(i), "url": f"spotify:track:{i}", "name": f"Song {i}", "author": "Daft Punk"}
+            for i in range(SEARCH_LIMIT)
+        ])
+        with self.upstream() as get:
+            response = self.client.get(reverse("spotify_search"), {"q": "daft"})
+
+        get.assert_not_called()
+        self.assertEqual(len(response.data["tracks"]["items"]), SEARCH_LIMIT)
+
+    def test_errors_are_not_cached(self):
+        with self.upstream(status_code=429) as get:
+            self.client.get(reverse("spotify_search"), {"q": "daft punk"})
+            self.client.get(reverse("spotify_search"), {"q": "daft punk"})
+
+        self.assertEqual(get.call_count, 2)
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user", password="secret"
+        )
+        self.token = SpotifyToken.objects.create(
+            user=self.user,
+            access_token="access",
+            refresh_token="refresh",
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+    def test_valid_token_is_served_without_queries(self):
+        token_cache.clear()
+        self.assertEqual(get_valid_spotify_token(self.user), "access")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_valid_spotify_token(self.user), "access")
+
+    def test_refresh_and_disconnect_update_the_cache(self):
+        self.token.access_token = "refreshed"
+        self.token.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_valid_spotify_token(self.user), "refreshed")
+
+        self.token.delete()
+        self.assertIsNone(get_valid_spotify_token(self.user))
+
+    def test_disconnect_is_seen_by_other_workers(self):
+        other_worker = TokenCache()
+        self.assertEqual(get_valid_spotify_token(self.user), "access")
+        self.assertEqual(other_worker.get("spotify", self.user.pk), "access")
+
+        self.token.delete()
+
+        self.assertIsNone(other_worker.get("spotify", self.user.pk))
+
+    def expire_token(self):
+        self.token.expires_at = timezone.now() + timedelta(seconds=30)
+        self.token.save()
+
+    def upstream_refresh(self):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {
+            "access_token": "refreshed",
+            "refresh_token": "rotated",
+            "expires_in": 3600,
+        }
+        return mock.patch("spotify.views.provider_http.post", return_value=response)
+
+    def test_token_close_to_expiry_is_refreshed_once(self):
+        self.expire_token()
+
+        with self.upstream_refresh() as post:
+            self.assertEqual(get_valid_spotify_token(self.user), "refreshed")
+            with self.assertNumQueries(0):
+                self.assertEqual(get_valid_spotify_token(self.user), "refreshed")
+            # A caller that queued behind the refresh reuses its result.
+            self.assertEqual(spotify_token_refresher.refresh(self.user.pk), "refreshed")
+
+        self.assertEqual(post.call_count, 1)
+        self.token.refresh_from_db()
+        self.assertEqual(self.token.refresh_token, "rotated")
+
+    def test_failed_refresh_keeps_a_still_valid_token(self):
+        self.expire_token()
+
+        with mock.patch(
+            "spotify.views.provider_http.post", return_value=mock.Mock(status_code=500)
+        ):
+            self.assertEqual(get_valid_spotify_token(self.user), "access")
+
+        self.token.expires_at = timezone.now() - timedelta(seconds=1)
+        self.token.save()
+        with mock.patch(
+            "spotify.views.provider_http.post", return_value=mock.Mock(status_code=500)
+        ):
+            self.assertIsNone(get_valid_spotify_token(self.user))
+
+    def test_refresh_by_another_process_wins(self):
+        self.expire_token()
+
+        def refreshed_elsewhere(refresh_token):
+            SpotifyToken.objects.filter(pk=self.token.pk).update(
+                access_token="other", refresh_token="other-refresh"
+            )
+            return {"access_token": "mine", "expires_in": 3600}
+
+        refresher = TokenRefresher("spotify", SpotifyToken, refreshed_elsewhere)
+
+        self.assertEqual(refresher.refresh(self.user.pk, ahead=timedelta(minutes=5)), "other")
+        self.token.refresh_from_db()
+        self.assertEqual(self.token.access_token, "other")
+
+    def test_sweep_refreshes_expiring_tokens(self):
+        self.expire_token()
+        out = StringIO()
+
+        with self.upstream_refresh():
+            call_command("refresh_provider_tokens", "--provider", "spotify", "--workers", "1", stdout=out)
+
+        self.assertIn("Refreshed 1 of 1", out.getvalue())
+
+    def test_sweep_counts_only_tokens_it_refreshed(self):
+        self.expire_token()
+        out = StringIO()
+
+        with mock.patch(
+            "spotify.views.provider_http.post", return_value=mock.Mock(status_code=500)
+        ):
+            call_command("refresh_provider_tokens", "--provider", "spotify", "--workers", "1", stdout=out)
+
+        self.assertIn("Refreshed 0 of 1", out.getvalue())
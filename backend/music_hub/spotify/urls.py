@@ -1,10 +1,12 @@
 from django.urls import path
+from . import async_views
 from .views import (
     spotify_login,
     spotify_callback,
     get_user_spotify_connection_status,
     spotify_disconnect,
     search,
+    search_cache_stats,
     get_spotify_token,
     get_user_playlists,
     get_user_playlist_details,
@@ -20,6 +22,7 @@ urlpatterns = [
     ),
     path("disconnect/", spotify_disconnect, name="spotify_disconnect"),
     path("search/", search, name="spotify_search"),
+    path("search/stats/", search_cache_stats, name="spotify_search_cache_stats"),
     path("token/", get_spotify_token, name="get_spotify_token"),
     path("playlist/", get_user_playlists, name="spotify_playlists"),
     path(
@@ -27,4 +30,12 @@ urlpatterns = [
         get_user_playlist_details,
         name="spotify_playlist_details",
     ),
+    # Async counterparts for the ASGI application.
+    path("async/search/", async_views.search, name="spotify_search_async"),
+    path("async/playlist/", async_views.get_user_playlists, name="spotify_playlists_async"),
+    path(
+        "async/playlist/<str:playlist_id>/",
+        async_views.get_user_playlist_details,
+        name="spotify_playlist_details_async",
+    ),
 ]
@@ -1,4 +1,3 @@
-import requests
 from django.contrib.auth import get_user_model
 from django.http import HttpResponseRedirect
 from django.conf import settings
@@ -10,21 +9,67 @@ from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from music_hub.http_clients import provider_http
+from music_hub.search_cache import search_cache
+from music_hub.token_cache import EXPIRY_MARGIN, token_cache
+from music_hub.token_refresh import TokenRefresher
+from playlist.catalog import top_up
+from playlist.models import Track
 from .models import SpotifyToken
 
 User = get_user_model()
 
+SEARCH_LIMIT = 10
+# Tokens this close to expiry are refreshed on use rather than handed out.
+REFRESH_AHEAD = timedelta(seconds=EXPIRY_MARGIN)
+
+
+def catalog_item(track):
+    """
+    Render a catalog Track in the shape of a Spotify search result item.
+    """
+    return {
+        "id": track.track_id,
+        "name": track.name,
+        "artists": [{"name": name} for name in track.author.split(", ")],
+        "uri": track.url,
+        "album": {"images": [{"url": track.image_url or ""}]},
+        "duration_ms": track.track_duration,
+    }
+
+
+def catalog_items(query):
+    tracks = Track.objects.search(query, platform="spotify", limit=SEARCH_LIMIT)
+    return [catalog_item(track) for track in tracks]
+
+
+def with_catalog_items(status_code, data, local_items):
+    """
+    Put catalog hits ahead of the Spotify response's items, topping up to
+    SEARCH_LIMIT with the Spotify hits not already among them.
+    """
+    if status_code != 200:
+        return {"tracks": {"items": local_items}} if local_items else data
+
+    tracks = data.get("tracks", {})
+    items = top_up(local_items, tracks.get("items", []), SEARCH_LIMIT)
+    return {**data, "tracks": {**tracks, "items": items}}
+
 
 def get_valid_spotify_token(user):
+    access_token = token_cache.get("spotify", user.pk)
+    if access_token:
+        return access_token
+
     try:
         token_obj = SpotifyToken.objects.get(user=user)
     except SpotifyToken.DoesNotExist:
         return None
-    if token_obj.expires_at <= timezone.now():
-        refresh_spotify_token(user)
-        token_obj.refresh_from_db()
+    if token_obj.expires_at <= timezone.now() + REFRESH_AHEAD:
+        return refresh_spotify_token(user)
+    token_cache.set("spotify", user.pk, token_obj.access_token, token_obj.expires_at)
     return token_obj.access_token
 
 
@@ -83,7 +128,7 @@ def spotify_callback(request):
         "client_id": settings.SOCIAL_AUTH_SPOTIFY_KEY,
         "client_secret": settings.SOCIAL_AUTH_SPOTIFY_SECRET,
     }
-    response = requests.post(token_url, data=payload)
+    response = provider_http.post(token_url, data=payload)
     token_info = response.json()
 
     access_token = token_info.get("access_token")
@@ -106,27 +151,28 @@ def spotify_callback(request):
     return redirect("http://localhost:3000/dashboard")
 
 
-@permission_classes([IsAuthenticated])
-def refresh_spotify_token(user):
-    token_obj = SpotifyToken.objects.get(user=user)
-    if token_obj.expires_at > timezone.now():
-        return token_obj.access_token
-
+def request_spotify_token_refresh(refresh_token):
     refresh_url = "https://accounts.spotify.com/api/token"
     payload = {
         "grant_type": "refresh_token",
-        "refresh_token": token_obj.refresh_token,
+        "refresh_token": refresh_token,
         "client_id": settings.SOCIAL_AUTH_SPOTIFY_KEY,
         "client_secret": settings.SOCIAL_AUTH_SPOTIFY_SECRET,
     }
-    response = requests.post(refresh_url, data=payload)
-    token_info = response.json()
-    new_access_token = token_info.get("access_token")
-    expires_in = token_info.get("expires_in")
-    token_obj.access_token = new_access_token
-    token_obj.expires_at = timezone.now() + timedelta(seconds=expires_in)
-    token_obj.save()
-    return new_access_token
+    response = provider_http.post(refresh_url, data=payload)
+
+    if response.status_code >= 400:
+        return None
+
+    return response.json()
+
+
+spotify_token_refresher = TokenRefresher("spotify", SpotifyToken, request_spotify_token_refresh)
+
+
+@permission_classes([IsAuthenticated])
+def refresh_spotify_token(user):
+    return spotify_token_refresher.refresh(user.pk, ahead=REFRESH_AHEAD)
 
 
 @api_view(["GET"])
@@ -136,7 +182,7 @@ def get_user_playlists(request):
     if not spotify_token:
         return Response({"error": "Spotify account not connected"}, status=400)
     headers = {"Authorization": f"Bearer {spotify_token}"}
-    response = requests.get("https://api.spotify.com/v1/me/playlists", headers=headers)
+    response = provider_http.get("https://api.spotify.com/v1/me/playlists", headers=headers)
     return Response(response.json())
 
 
@@ -148,7 +194,7 @@ def get_user_playlist_details(request, playlist_id: str):
         return Response({"error": "Spotify account not connected"}, status=400)
 
     headers = {"Authorization": f"Bearer {spotify_token}"}
-    response = requests.get(
+    response = provider_http.get(
         f"https://api.spotify.com/v1/playlists/{playlist_id}", headers=headers
     )
 
@@ -200,9 +246,24 @@ def search(request):
 
     url = "https://api.spotify.com/v1/search"
     headers = {"Authorization": f"Bearer {token}"}
-    params = {"q": query, "type": "track", "limit": 10}
-    response = requests.get(url, headers=headers, params=params)
-    return Response(response.json())
+    params = {"q": query, "type": "track", "limit": SEARCH_LIMIT}
+
+    def fetch():
+        response = provider_http.get(url, headers=headers, params=params)
+        return response.status_code, response.json()
+
+    local_items = catalog_items(query)
+    if len(local_items) >= SEARCH_LIMIT:
+        return Response({"tracks": {"items": local_items}})
+
+    status_code, data = search_cache.get_or_fetch("spotify", query, SEARCH_LIMIT, fetch)
+    return Response(with_catalog_items(status_code, data, local_items))
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def search_cache_stats(request):
+    return Response(search_cache.stats("spotify"))
 
 
 @api_view(["GET"])
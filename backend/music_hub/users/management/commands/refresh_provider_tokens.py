@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from spotify.views import spotify_token_refresher
+from soundcloud.views import soundcloud_token_refresher
+
+REFRESHERS = {
+    "spotify": spotify_token_refresher,
+    "soundcloud": soundcloud_token_refresher,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh Spotify and SoundCloud tokens that expire within --ahead "
+        "seconds. Meant to run periodically (cron, systemd timer) so request "
+        "threads rarely have to refresh a token themselves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=600)
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--provider", choices=sorted(REFRESHERS), action="append")
+
+    def handle(self, *args, **options):
+        ahead = timedelta(seconds=options["ahead"])
+        providers = options["provider"] or sorted(REFRESHERS)
+
+        jobs = [
+            (provider, user_id)
+            for provider in providers
+            for user_id in REFRESHERS[provider].expiring_user_ids(ahead)
+        ]
+
+        def refresh(job):
+            provider, user_id = job
+            _, refreshed = REFRESHERS[provider].refresh_status(user_id, ahead=ahead)
+            return refreshed
+
+        def refresh_in_worker(job):
+            try:
+                return refresh(job)
+            finally:
+                connections.close_all()
+
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                results = list(executor.map(refresh_in_worker, jobs))
+        else:
+            results = [refresh(job) for job in jobs]
+
+        self.stdout.write(
+            f"Refreshed {sum(results)} of {len(jobs)} tokens expiring within {options['ahead']}s"
+        )
@@ -11,8 +11,8 @@ const AddToPlaylistModal = ({ isOpen, onClose, track }) => {
 
     useEffect(() => {
         if (isOpen && hubPlaylists.length === 0) {
-            authAPI.getUserPlaylists()
-                .then(res => dispatch(setHubPlaylists(res.data)))
+            authAPI.getAllUserPlaylists()
+                .then(playlists => dispatch(setHubPlaylists(playlists)))
                 .catch(err => console.log(err));
         }
     }, [dispatch, hubPlaylists.length, isOpen]);
@@ -21,7 +21,7 @@ const Library = () => {
         queries: [
             {
                 queryKey: ['playlists', 'hub'],
-                queryFn: () => authAPI.getUserPlaylists().then(res => res.data || []),
+                queryFn: () => authAPI.getAllUserPlaylists(),
                 staleTime: 1000 * 60 * 5 // Dane są "świeże" przez 5 minut
             },
             {
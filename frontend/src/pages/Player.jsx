@@ -41,7 +41,7 @@ const Player = () => {
     } else {
       authAPI.getPlaylists(query)
         .then(resp => {
-            setCustomPlaylists(resp.data);
+            setCustomPlaylists(resp.data.results);
         })
         .catch(err => {
             console.error("Błąd szukania playlist", err);
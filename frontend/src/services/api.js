@@ -16,6 +16,17 @@ export const authAPI = {
       }
   }),
   getUserPlaylists: () => api.get("/playlist/user/"),
+  // Follows the cursor pagination until every page of the user's playlists is loaded.
+  getAllUserPlaylists: async () => {
+      const playlists = [];
+      let res = await api.get("/playlist/user/", { params: { page_size: 200 } });
+      playlists.push(...res.data.results);
+      while (res.data.next) {
+          res = await api.get(res.data.next);
+          playlists.push(...res.data.results);
+      }
+      return playlists;
+  },
   getUserPlaylist: (playlistId) => api.get(`/playlist/${playlistId}`),
   addTrackToPlaylist: (playlistId, track_data) => api.post(`/playlist/${playlistId}/add_track/`, track_data),
   editPlaylist: (playlistId, data) => api.put(`/playlist/${playlistId}/`, data),